@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Artist lineup tokenizer shared by the scrapers and importers
+Splits "A w/ B, C & D" on every separator in one regex pass and strips
+live/concert/show/performance prefixes and suffixes with precompiled patterns
+"""
+
+import re
+from functools import lru_cache
+from typing import Iterable, List, Tuple
+
+# Every lineup separator as one alternation, so a title is split in a single pass
+SEPARATORS = re.compile(
+    r'\s+(?:w/|with|\+|&|and|featuring|feat\.|ft\.|/|\||presents:?)\s+|,\s+',
+    re.I,
+)
+PREFIX = re.compile(r'^(?:live|concert|show|performance)\s+', re.I)
+SUFFIX = re.compile(r'\s+(?:live|concert|show|performance)$', re.I)
+
+MIN_NAME_LENGTH = 3
+
+
+@lru_cache(maxsize=8192)
+def _tokenize(title: str) -> Tuple[str, ...]:
+    artists = []
+    seen = set()
+    for part in SEPARATORS.split(title):
+        name = SUFFIX.sub('', PREFIX.sub('', part.strip()))
+        if len(name) >= MIN_NAME_LENGTH and name.lower() not in seen:
+            seen.add(name.lower())
+            artists.append(name)
+    return tuple(artists)
+
+
+def tokenize_artists(title: str) -> List[str]:
+    """Split an event title into artist names, headliner first"""
+    if not title:
+        return []
+    return list(_tokenize(title.strip()))
+
+
+def tokenize_artists_batch(titles: Iterable[str]) -> List[List[str]]:
+    """tokenize_artists over many titles; repeated titles come from the cache"""
+    return [tokenize_artists(title) for title in titles]
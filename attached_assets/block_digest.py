@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Incremental parsing for calendar pages
+Digests each extracted event block (its visible text, so ads and timestamps outside the
+event region don't count) and keeps the events parsed from every block between runs.
+An unchanged region reuses every block's events; otherwise only new or edited blocks are parsed.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from datetime import date
+from typing import Callable, Dict, List
+
+
+def block_digest(block) -> str:
+    """Digest of a block's whitespace-normalized text"""
+    text = ' '.join(block.get_text(' ').split())
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+class BlockDigests:
+    """Per-venue region digest plus block digest -> parsed events, persisted as JSON"""
+
+    def __init__(self, path: str = ".scrape_state/block_digests.json"):
+        self.path = path
+        self.stats: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        try:
+            with open(path) as f:
+                self._state = json.load(f)
+        except (OSError, ValueError):
+            self._state = {}
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self._state, f)
+        os.replace(tmp_path, self.path)
+
+    def parse(self, venue: str, blocks: List, parse_block: Callable[[object], List[Dict]]) -> List[Dict]:
+        """Events for `blocks`, calling parse_block only on blocks not seen in the last run"""
+        digests = [block_digest(block) for block in blocks]
+        region = hashlib.sha1("\n".join(digests).encode("ascii")).hexdigest()
+        with self._lock:
+            previous = self._state.get(venue, {})
+        cached = previous.get("blocks", {})
+        unchanged = previous.get("region") == region
+
+        events = []
+        blocks_events = {}
+        reparsed = 0
+        for block, digest in zip(blocks, digests):
+            if digest not in blocks_events:
+                if digest in cached:
+                    blocks_events[digest] = cached[digest]
+                else:
+                    blocks_events[digest] = parse_block(block)
+                    reparsed += 1
+            events.extend(blocks_events[digest])
+
+        # Cached blocks may hold shows that have since passed
+        today = date.today().isoformat()
+        events = [event for event in events if event["date"] >= today]
+
+        with self._lock:
+            self.stats[venue] = {
+                "unchanged": unchanged,
+                "blocks": len(blocks),
+                "skipped": len(blocks) - reparsed,
+                "reparsed": reparsed,
+            }
+            if not unchanged:
+                self._state[venue] = {"region": region, "blocks": blocks_events}
+                self._save()
+        return events
+
+    def changed_venues(self) -> List[str]:
+        return [venue for venue, stats in self.stats.items() if not stats["unchanged"]]
+
+    def summary(self, venue: str) -> str:
+        stats = self.stats.get(venue)
+        if stats is None:
+            return "not parsed"
+        if stats["unchanged"]:
+            return f"unchanged, skipped all {stats['blocks']} blocks"
+        return f"{stats['reparsed']} blocks reparsed, {stats['skipped']} skipped"
@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""
+Persistent per-venue browser contexts for the Playwright scrapers
+Each venue keeps one context open on the shared browser for as long as the runner lives, and its
+storage state (cookies, localStorage) is saved under .scrape_state/browser/ after every good
+scrape, so the next process starts where the last one left off: consent given, signup popup
+already seen. Scripts the pages load are kept in an on-disk asset cache and served from it on
+repeat visits instead of being downloaded again.
+
+Overlays (consent banners, signup popups) are suppressed declaratively: OVERLAY_RULES plus a
+venue module's OVERLAYS become an init script that runs before any page script and hides the
+matching elements, so scrapers no longer have to find and click them.
+
+    python browser_profiles.py                    saved storage states and asset cache size
+    python browser_profiles.py --reset [venue]    forget storage state (all venues by default)
+    python browser_profiles.py --clear-cache      empty the asset cache
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional
+
+STATE_DIR = ".scrape_state/browser"
+
+# Hidden on every venue: OptinMonster campaigns and the common consent-banner widgets
+OVERLAY_RULES = {
+    "hide": [
+        "[id^='om-'][id$='-holder']",
+        "#onetrust-consent-sdk",
+        "#CybotCookiebotDialog",
+        "#cookie-law-info-bar",
+        ".cc-window",
+    ],
+    "local_storage": {},
+}
+
+# Static assets worth keeping between visits; documents and XHR/fetch data are always fetched fresh
+CACHEABLE_TYPES = {"script"}
+# How long a cached asset is served when its response has no Cache-Control max-age
+DEFAULT_ASSET_TTL = 24 * 3600
+# Header marking responses served from the asset cache, so load stats don't count them as transferred
+CACHE_HEADER = "x-scraper-cache"
+# route.fetch() hands back the decoded body, so these no longer describe what is stored
+STRIPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+
+
+def overlay_rules(venue_rules: Optional[Dict] = None) -> Dict:
+    """OVERLAY_RULES merged with a venue module's OVERLAYS"""
+    venue_rules = venue_rules or {}
+    return {
+        "hide": OVERLAY_RULES["hide"] + list(venue_rules.get("hide", ())),
+        "local_storage": dict(OVERLAY_RULES["local_storage"], **venue_rules.get("local_storage", {})),
+    }
+
+
+def overlay_script(rules: Dict) -> str:
+    """Init script that hides the rules' selectors and seeds their localStorage keys before page scripts run"""
+    css = ",".join(rules["hide"]) + "{display:none !important}" if rules["hide"] else ""
+    return """
+(() => {
+    const css = %s, storage = %s;
+    for (const [key, value] of Object.entries(storage)) {
+        try { localStorage.setItem(key, value); } catch (e) {}
+    }
+    if (!css) return;
+    const inject = () => {
+        const style = document.createElement("style");
+        style.textContent = css;
+        (document.head || document.documentElement).appendChild(style);
+    };
+    if (document.documentElement) inject(); else document.addEventListener("DOMContentLoaded", inject);
+})();
+""" % (json.dumps(css), json.dumps(rules["local_storage"]))
+
+
+def storage_path(venue: str) -> str:
+    return os.path.join(STATE_DIR, "storage", venue + ".json")
+
+
+def context_options(venue: str) -> Dict:
+    """new_context() keyword arguments restoring the venue's saved storage state, if there is one"""
+    path = storage_path(venue)
+    return {"storage_state": path} if os.path.exists(path) else {}
+
+
+def save_storage_state(venue: str, state: Dict):
+    """Write a context.storage_state() result; atomic, as several worker processes may share the directory"""
+    path = storage_path(venue)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp_path, path)
+
+
+def _max_age(headers: Dict[str, str]) -> Optional[float]:
+    """Seconds an asset may be reused for, 0 when it must not be stored, None when the response doesn't say"""
+    cache_control = headers.get("cache-control", "").lower()
+    if "no-store" in cache_control or "private" in cache_control:
+        return 0
+    for directive in cache_control.split(","):
+        name, _, value = directive.strip().partition("=")
+        if name == "max-age" and value.isdigit():
+            return float(value)
+    return None
+
+
+class AssetCache:
+    """Disk cache of static assets: <key>.body + <key>.json per URL, evicted least recently used first
+
+    There is no shared index, so worker processes can use the same directory.
+    """
+
+    def __init__(self, cache_dir: str = os.path.join(STATE_DIR, "assets"), max_bytes: int = 100 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.stats = {"hits": 0, "misses": 0, "stored": 0, "evictions": 0}
+        self._lock = threading.Lock()
+
+    def _path(self, url: str, suffix: str) -> str:
+        key = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, key + suffix)
+
+    def lookup(self, url: str) -> Optional[Dict]:
+        """A fresh entry {status, headers, body} for url, or None"""
+        try:
+            with open(self._path(url, ".json")) as f:
+                entry = json.load(f)
+            if time.time() > entry["expires"]:
+                return None
+            with open(self._path(url, ".body"), "rb") as f:
+                entry["body"] = f.read()
+        except (OSError, ValueError, KeyError):
+            return None
+        # mtime is the LRU clock
+        os.utime(self._path(url, ".json"))
+        return entry
+
+    def store(self, url: str, status: int, headers: Dict[str, str], body: bytes):
+        max_age = _max_age(headers)
+        if status != 200 or max_age == 0:
+            return
+        expires = time.time() + (DEFAULT_ASSET_TTL if max_age is None else max_age)
+        headers = {name: value for name, value in headers.items() if name.lower() not in STRIPPED_HEADERS}
+        os.makedirs(self.cache_dir, exist_ok=True)
+        suffix = f".{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(self._path(url, ".body") + suffix, "wb") as f:
+            f.write(body)
+        os.replace(self._path(url, ".body") + suffix, self._path(url, ".body"))
+        # Written last: an entry only exists once its body is complete
+        with open(self._path(url, ".json") + suffix, "w") as f:
+            json.dump({"url": url, "status": status, "headers": headers, "expires": expires, "size": len(body)}, f)
+        os.replace(self._path(url, ".json") + suffix, self._path(url, ".json"))
+        with self._lock:
+            self.stats["stored"] += 1
+
+    async def handle(self, route, request):
+        """Context route handler (async API): serve cacheable GETs from disk, store the ones that miss"""
+        if request.method != "GET" or request.resource_type not in CACHEABLE_TYPES:
+            return await route.fallback()
+        entry = self.lookup(request.url)
+        if entry is not None:
+            with self._lock:
+                self.stats["hits"] += 1
+            headers = dict(entry["headers"], **{CACHE_HEADER: "hit"})
+            return await route.fulfill(status=entry["status"], headers=headers, body=entry["body"])
+        with self._lock:
+            self.stats["misses"] += 1
+        try:
+            response = await route.fetch()
+            body = await response.body()
+        except Exception:
+            # Let the browser make (and fail) the request itself, so the page sees the usual error
+            return await route.fallback()
+        self.store(request.url, response.status, response.headers, body)
+        await route.fulfill(response=response, body=body)
+
+    def size(self) -> Dict[str, int]:
+        entries = total = 0
+        try:
+            names = os.listdir(self.cache_dir)
+        except OSError:
+            names = []
+        for name in names:
+            if name.endswith(".body"):
+                entries += 1
+                total += os.path.getsize(os.path.join(self.cache_dir, name))
+        return {"entries": entries, "bytes": total}
+
+    def evict(self):
+        """Drop least recently used entries until the cache fits in max_bytes"""
+        try:
+            names = [name for name in os.listdir(self.cache_dir) if name.endswith(".json")]
+        except OSError:
+            return
+        entries = []
+        for name in names:
+            path = os.path.join(self.cache_dir, name)
+            try:
+                entries.append((os.path.getmtime(path), path, os.path.getsize(path[:-len(".json")] + ".body")))
+            except OSError:
+                continue
+        total = sum(size for _, _, size in entries)
+        for _, path, size in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            for victim in (path, path[:-len(".json")] + ".body"):
+                try:
+                    os.remove(victim)
+                except FileNotFoundError:
+                    pass
+            total -= size
+            self.stats["evictions"] += 1
+
+    def clear(self):
+        max_bytes, self.max_bytes = self.max_bytes, 0
+        try:
+            self.evict()
+        finally:
+            self.max_bytes = max_bytes
+
+
+class ContextPool:
+    """One long-lived context per venue on a shared async browser, at most `max_contexts` open at once"""
+
+    def __init__(self, browser, max_contexts: int = 8, cache: Optional[AssetCache] = None):
+        self.browser = browser
+        self.max_contexts = max_contexts
+        self.cache = cache or AssetCache()
+        # venue -> {"context", "leases", "used"}
+        self._open: Dict[str, Dict] = {}
+        # venue -> asyncio.Lock held while its context is being created
+        self._creating: Dict[str, object] = {}
+
+    async def _create(self, venue: str, module):
+        context = await self.browser.new_context(**context_options(venue))
+        await context.add_init_script(script=overlay_script(overlay_rules(getattr(module, "OVERLAYS", None))))
+        await context.route("**/*", self.cache.handle)
+        return context
+
+    async def _discard(self, venue: str):
+        slot = self._open.pop(venue, None)
+        if slot is not None:
+            await slot["context"].close()
+
+    async def _make_room(self):
+        idle = sorted((slot["used"], venue) for venue, slot in self._open.items() if not slot["leases"])
+        while len(self._open) >= self.max_contexts and idle:
+            await self._discard(idle.pop(0)[1])
+
+    async def _acquire(self, venue: str, module) -> Dict:
+        """The venue's slot with a lease taken; concurrent first leases wait for one context, not make two"""
+        import asyncio
+        if venue not in self._creating:
+            self._creating[venue] = asyncio.Lock()
+        async with self._creating[venue]:
+            slot = self._open.get(venue)
+            if slot is None:
+                await self._make_room()
+                slot = self._open[venue] = {"context": await self._create(venue, module), "leases": 0, "used": 0.0}
+            slot["leases"] += 1
+        return slot
+
+    @asynccontextmanager
+    async def lease(self, venue: str, module):
+        """The venue's context; its storage state is saved if the block succeeds, the context dropped if not"""
+        slot = await self._acquire(venue, module)
+        slot["used"] = time.time()
+        try:
+            yield slot["context"]
+        except BaseException:
+            slot["leases"] -= 1
+            # A context a page load failed in may be wedged; the next lease starts a fresh one
+            if not slot["leases"] and self._open.get(venue) is slot:
+                await self._discard(venue)
+            raise
+        slot["leases"] -= 1
+        save_storage_state(venue, await slot["context"].storage_state())
+
+    async def close(self):
+        for venue in list(self._open):
+            await self._discard(venue)
+        self.cache.evict()
+
+
+def saved_states() -> List[Dict]:
+    directory = os.path.dirname(storage_path("x"))
+    try:
+        names = sorted(name for name in os.listdir(directory) if name.endswith(".json"))
+    except OSError:
+        return []
+    states = []
+    for name in names:
+        path = os.path.join(directory, name)
+        try:
+            with open(path) as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            continue
+        states.append({"venue": name[:-len(".json")], "saved": os.path.getmtime(path),
+                       "cookies": len(state.get("cookies", [])),
+                       "origins": len(state.get("origins", []))})
+    return states
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect or reset the persistent browser profiles")
+    parser.add_argument("venues", nargs="*", help="venues to reset with --reset (default: all)")
+    parser.add_argument("--reset", action="store_true", help="delete saved storage state")
+    parser.add_argument("--clear-cache", action="store_true", help="empty the asset cache")
+    args = parser.parse_args()
+
+    if args.reset:
+        for state in saved_states():
+            if not args.venues or state["venue"] in args.venues:
+                os.remove(storage_path(state["venue"]))
+                print(f"Reset {state['venue']}")
+    if args.clear_cache:
+        AssetCache().clear()
+        print("Asset cache cleared")
+    if not (args.reset or args.clear_cache):
+        states = saved_states()
+        if not states:
+            print("No saved storage states")
+        for state in states:
+            saved = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(state["saved"]))
+            print(f"{state['venue']:12} saved {saved}  {state['cookies']:3} cookies  "
+                  f"{state['origins']:2} origins with localStorage")
+        size = AssetCache().size()
+        print(f"Asset cache: {size['entries']} assets, {size['bytes'] / 1024:.0f} KiB")
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Sharded multi-process crawl coordinator
+Feeds a shared queue of crawl targets to a pool of worker processes. Each worker has its own
+browser (started only if it gets a browser venue) and HTTP session and runs a few targets at
+once. Every worker sets fetch_policy's host limit, which caps requests in flight to any one
+fetched host across all of them, one slot per request, so venues behind the same ticketing host
+(SeeTickets, TicketWeb, ...) don't pile onto it.
+Results come back on a second queue and are merged and deduplicated in the coordinator,
+which is also the only process that updates the recrawl schedule.
+
+A target is {"venue": key, "source": "browser" | "simple"}, optionally with its
+own "timeout" in seconds; --venues takes a JSON list of them, by default every venue
+scraper_worker knows is crawled. Results are kept per target, in target order.
+
+Nothing can hang the crawl: each target runs under its timeout as a deadline, host slots are
+waited for only while it lasts, and the coordinator fails a target that overruns it. When a
+worker dies, its targets are failed at once; the host slots it held are freed with its process.
+
+    python crawl_coordinator.py [--venues FILE] [--workers N] [--per-host 2] [--timeout 300] [--due] [--output FILE]
+    python crawl_coordinator.py --bench 200 [--workers 1,2,4]    offline scaling run on fixtures/
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import queue
+import sys
+import time
+from typing import Dict, List, Optional
+
+from fingerprint_index import event_fingerprint
+from recrawl_scheduler import VENUE_SOURCES, RecrawlScheduler
+from scraper_utils import print_events
+
+# Seconds a target may take, host slot waits included, until it returns its events
+TARGET_TIMEOUT = 300
+# Extra time the coordinator allows past a target's deadline for the worker to report it
+REPORT_GRACE = 30
+
+# fixture -> (EventScraper parse method, URL the fixture stands for), for --bench
+FIXTURE_PARSERS = {
+    "independent": ("parse_independent", "https://www.theindependentsf.com/"),
+    "bottom": ("parse_bottom_of_hill", "https://www.bottomofthehill.com/calendar.html"),
+    "cafe": ("parse_cafe_du_nord", "https://www.cafedunord.com/"),
+}
+
+
+def default_targets() -> List[Dict]:
+    return [{"venue": venue, "source": source} for venue, source in VENUE_SOURCES.items()]
+
+
+def _scrape_fixture(target: Dict) -> List[Dict]:
+    from improved_scrapers import EventScraper
+    from parse_bench import load_fixture
+    method, url = FIXTURE_PARSERS[target["fixture"]]
+    content = load_fixture(target["fixture"], target.get("scale", 1))
+    return getattr(EventScraper(), method)(content, url)
+
+
+async def _serve(tasks, results, per_worker: int):
+    import asyncio
+    from deadline import deadline
+    from scrape_metrics import METRICS
+    from scraper_worker import ScraperWorker
+
+    worker = ScraperWorker(None, concurrency=per_worker)
+
+    async def scrape(target: Dict) -> List[Dict]:
+        if target["source"] == "fixture":
+            return await asyncio.to_thread(_scrape_fixture, target)
+        return await worker.scrape(target["venue"], target["source"])
+
+    async def run_target(index: int, target: Dict) -> Dict:
+        seconds = target.get("timeout", TARGET_TIMEOUT)
+        started = time.perf_counter()
+        result = {"index": index, "venue": target["venue"], "source": target["source"], "pid": os.getpid()}
+        # Tells the coordinator which process holds the target, in case it dies
+        results.put({"index": index, "started": True, "pid": os.getpid()})
+        try:
+            # The deadline lets the scrapers stop early and keep what they have; wait_for is the backstop
+            with deadline(seconds):
+                events = await asyncio.wait_for(scrape(target), seconds)
+            result.update(ok=True, events=events)
+        except asyncio.TimeoutError:
+            result.update(ok=False, events=[], error=f"timed out after {seconds}s")
+        except Exception as e:
+            result.update(ok=False, events=[], error=f"{type(e).__name__}: {e}")
+        result["elapsed"] = time.perf_counter() - started
+        result["metrics"] = METRICS.take(target["venue"])
+        return result
+
+    async def run_targets():
+        while True:
+            task = await asyncio.to_thread(tasks.get)
+            if task is None:
+                return
+            index, target = task
+            # Targets for the same venue may run side by side; each keeps its own metrics
+            with METRICS.scope(index):
+                results.put(await run_target(index, target))
+
+    try:
+        await asyncio.gather(*(run_targets() for _ in range(per_worker)))
+    finally:
+        await worker.runner.close()
+
+
+def _work(tasks, results, per_worker: int, per_host: int):
+    # Scraper progress goes to stderr; the coordinator owns stdout
+    sys.stdout = sys.stderr
+    import asyncio
+    from fetch_policy import POLICY
+    POLICY.limit_hosts(per_host)
+    asyncio.run(_serve(tasks, results, per_worker))
+
+
+class CrawlCoordinator:
+    """Shards targets over `workers` processes, at most `per_host` in flight per host across all of them"""
+
+    def __init__(self, workers: Optional[int] = None, per_worker: int = 2, per_host: int = 2,
+                 scheduler: Optional[RecrawlScheduler] = None, target_timeout: float = TARGET_TIMEOUT):
+        self.workers = workers or os.cpu_count() or 1
+        self.per_worker = per_worker
+        self.per_host = per_host
+        self.scheduler = scheduler
+        self.target_timeout = target_timeout
+        # spawn, not fork: workers start browsers and threads, which don't survive a fork
+        self._mp = multiprocessing.get_context("spawn")
+
+    def crawl(self, targets: List[Dict]) -> Dict:
+        """Crawl every target; returns merged deduplicated events plus per-target results in target order"""
+        tasks = self._mp.Queue()
+        results = self._mp.Queue()
+        targets = [dict(target, timeout=target.get("timeout", self.target_timeout)) for target in targets]
+        for index, target in enumerate(targets):
+            tasks.put((index, target))
+        workers = min(self.workers, len(targets)) or 1
+        for _ in range(workers * self.per_worker):
+            tasks.put(None)
+
+        started = time.perf_counter()
+        processes = [self._mp.Process(target=_work, args=(tasks, results, self.per_worker, self.per_host),
+                                      daemon=True) for _ in range(workers)]
+        for process in processes:
+            process.start()
+
+        merged, seen, reported = [], set(), {}
+        # index -> (pid, started) of targets a worker has begun
+        running: Dict[int, tuple] = {}
+
+        def fail(index: int, error: str, pid: Optional[int] = None):
+            reported[index] = dict(targets[index], index=index, ok=False, events=0, pid=pid, error=error)
+
+        while len(reported) < len(targets):
+            try:
+                result = results.get(timeout=1)
+            except queue.Empty:
+                # Drained, so whatever a dead worker sent has been seen
+                self._reap(processes, targets, running, fail)
+                if not any(process.is_alive() for process in processes):
+                    # Every worker is gone; whatever hasn't reported is a failure
+                    for index in range(len(targets)):
+                        if index not in reported:
+                            fail(index, "worker exited before reporting")
+                continue
+            if "started" in result:
+                if result["index"] not in reported:
+                    running[result["index"]] = (result["pid"], time.perf_counter())
+                continue
+            running.pop(result["index"], None)
+            if result["index"] in reported:
+                # Already failed as overdue; the late events are dropped with it
+                continue
+            events = result.pop("events")
+            reported[result["index"]] = dict(result, events=len(events))
+            partial = bool(result["metrics"] and result["metrics"]["partial"])
+            if result["ok"] and not partial and self.scheduler is not None and result["source"] != "fixture":
+                self.scheduler.record(result["venue"], events, result["elapsed"])
+            for event in events:
+                fp = event_fingerprint(event)
+                if fp is None or fp[0] not in seen:
+                    if fp is not None:
+                        seen.add(fp[0])
+                    merged.append(event)
+        for process in processes:
+            # A worker still stuck on an overdue target isn't waited for
+            process.join(timeout=1)
+            if process.is_alive():
+                process.terminate()
+        return {"events": merged, "venues": [reported[index] for index in range(len(targets))],
+                "workers": workers, "elapsed": time.perf_counter() - started}
+
+    def _reap(self, processes, targets: List[Dict], running: Dict[int, tuple], fail):
+        """Fail targets whose worker died or that are past their deadline"""
+        dead = {process.pid: process.exitcode for process in processes if not process.is_alive()}
+        now = time.perf_counter()
+        for index, (pid, started) in list(running.items()):
+            target = targets[index]
+            if pid in dead:
+                del running[index]
+                fail(index, f"worker {pid} exited with code {dead[pid]}", pid)
+            elif now - started > target["timeout"] + REPORT_GRACE:
+                del running[index]
+                fail(index, f"no result within {target['timeout']}s", pid)
+
+
+def _report(result: Dict):
+    venues = result["venues"]
+    failed = [venue for venue in venues if not venue["ok"]]
+    pids = {venue["pid"] for venue in venues if venue["pid"]}
+    for venue in failed:
+        print(f"❌ {venue['venue']}: {venue['error']}", file=sys.stderr)
+    print(f"Crawled {len(result['venues'])} venues ({len(failed)} failed) with {result['workers']} workers "
+          f"({len(pids)} used) in {result['elapsed']:.2f}s: {len(result['events'])} unique events", file=sys.stderr)
+
+
+def bench(n: int, worker_counts: List[int], per_host: int, scale: int = 5):
+    """Crawl n fixture venues with each worker count; reports venues/sec and speedup"""
+    fixtures = list(FIXTURE_PARSERS)
+    targets = [{"venue": f"bench-{i}", "source": "fixture", "fixture": fixtures[i % len(fixtures)],
+                "scale": scale} for i in range(n)]
+    print(f"{n} fixture venues at {scale}x on {os.cpu_count()} CPUs", file=sys.stderr)
+    baseline = None
+    for workers in worker_counts:
+        result = CrawlCoordinator(workers, per_worker=1, per_host=per_host).crawl(targets)
+        rate = n / result["elapsed"]
+        baseline = baseline or rate
+        print(f"{workers:3} workers: {result['elapsed']:6.2f}s  {rate:7.1f} venues/s  "
+              f"{rate / baseline:4.2f}x", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Crawl venues across a pool of worker processes")
+    parser.add_argument("--venues", help="JSON list of {venue, source} targets (default: every known venue)")
+    parser.add_argument("--workers", help="worker processes (default: CPU count); a comma list with --bench")
+    parser.add_argument("--per-worker", type=int, default=2, help="targets each worker runs at once")
+    parser.add_argument("--per-host", type=int, default=2, help="max concurrent requests per host across workers")
+    parser.add_argument("--timeout", type=float, default=TARGET_TIMEOUT,
+                        help=f"seconds each target may take (default {TARGET_TIMEOUT})")
+    parser.add_argument("--due", action="store_true", help="only crawl venues the recrawl schedule says are due")
+    parser.add_argument("--output", help="write merged events here instead of stdout")
+    parser.add_argument("--bench", type=int, metavar="N", help="offline scaling benchmark with N fixture venues")
+    args = parser.parse_args()
+
+    if args.bench:
+        counts = [int(n) for n in (args.workers or "1,2,4").split(",")]
+        bench(args.bench, counts, args.per_host)
+        return
+
+    if args.venues:
+        with open(args.venues) as f:
+            targets = json.load(f)
+    else:
+        targets = default_targets()
+    scheduler = RecrawlScheduler()
+    if args.due:
+        due = set(scheduler.due([target["venue"] for target in targets]))
+        targets = [target for target in targets if target["venue"] in due]
+    if not targets:
+        print("Nothing to crawl", file=sys.stderr)
+        return
+
+    result = CrawlCoordinator(int(args.workers) if args.workers else None, args.per_worker, args.per_host,
+                              scheduler, args.timeout).crawl(targets)
+    _report(result)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result["events"], f, indent=2)
+    else:
+        print_events(result["events"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Shared date normalization for every venue scraper
+Dispatches on precompiled patterns instead of strptime format guessing, memoizes raw strings
+in a bounded LRU, and infers missing years relative to the scrape date
+
+`python date_engine.py --bench` compares it with the per-call strptime loop it replaces.
+"""
+
+import re
+import sys
+import time
+from datetime import date, timedelta
+from functools import lru_cache
+from typing import Iterable, List, Optional
+
+# A yearless date more than this far behind the scrape date belongs to next year ("Jan 3" seen in December)
+PAST_GRACE_DAYS = 30
+
+MONTHS = {
+    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "may": 5, "jun": 6,
+    "jul": 7, "aug": 8, "sep": 9, "oct": 10, "nov": 11, "dec": 12,
+}
+
+# Tried in order; the first pattern that yields a valid calendar date wins
+PATTERNS = [
+    # 2025-05-01
+    re.compile(r'\b(?P<year>\d{4})-(?P<month>\d{1,2})-(?P<day>\d{1,2})\b'),
+    # Thu May 1 / May 1st / July 29, 2025 / July 29\n2025 / Sept. 5 2025
+    re.compile(
+        r'\b(?P<month>jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?'
+        r'|sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)\.?'
+        r'\s+(?P<day>\d{1,2})(?:st|nd|rd|th)?\b(?:,?\s+(?P<year>\d{4})\b)?',
+        re.I,
+    ),
+    # 5/1/2025, 5-1-25, SAT 1/18
+    re.compile(r'\b(?P<month>\d{1,2})[/-](?P<day>\d{1,2})(?:[/-](?P<year>\d{4}|\d{2}))?\b'),
+]
+
+
+def _month_number(token: str) -> int:
+    if token.isdigit():
+        return int(token)
+    return MONTHS[token[:3].lower()]
+
+
+def _infer_year(month: int, day: int, today: date) -> Optional[date]:
+    for year in range(today.year, today.year + 5):
+        try:
+            candidate = date(year, month, day)
+        except ValueError:
+            # Feb 29 outside a leap year - try the following years
+            continue
+        if candidate >= today - timedelta(days=PAST_GRACE_DAYS):
+            return candidate
+    return None
+
+
+@lru_cache(maxsize=4096)
+def _parse(raw: str, today: date) -> Optional[date]:
+    for pattern in PATTERNS:
+        for match in pattern.finditer(raw):
+            try:
+                month = _month_number(match.group("month"))
+                day = int(match.group("day"))
+                year = match.group("year")
+                if year is None:
+                    parsed = _infer_year(month, day, today)
+                else:
+                    year = int(year)
+                    if year < 100:
+                        year += 2000
+                    parsed = date(year, month, day)
+            except (KeyError, ValueError):
+                continue
+            if parsed is not None:
+                return parsed
+    return None
+
+
+def parse_date(raw: Optional[str], today: Optional[date] = None) -> Optional[date]:
+    """Find the first date in `raw`; yearless dates roll forward relative to `today` (the scrape date)"""
+    if not raw:
+        return None
+    return _parse(raw.strip(), today or date.today())
+
+
+def normalize_date(raw: Optional[str], today: Optional[date] = None) -> Optional[str]:
+    """Return `raw` as YYYY-MM-DD, or None when it holds no recognizable date"""
+    parsed = parse_date(raw, today)
+    return parsed.isoformat() if parsed else None
+
+
+def normalize_dates(raws: Iterable[Optional[str]], today: Optional[date] = None) -> List[Optional[str]]:
+    """Batch form of normalize_date; every entry shares one scrape date"""
+    today = today or date.today()
+    return [normalize_date(raw, today) for raw in raws]
+
+
+def cache_info():
+    return _parse.cache_info()
+
+
+def _legacy_normalize(raw: str) -> Optional[str]:
+    """The per-call strptime guessing loop the scrapers used before this module"""
+    from datetime import datetime
+    cleaned = raw.replace("\n", " ").replace(",", "").strip()
+    for fmt in ("%a %b %d", "%B %d %Y", "%b %d %Y", "%m/%d/%Y", "%m/%d/%y", "%m/%d", "%Y-%m-%d"):
+        try:
+            parsed = datetime.strptime(cleaned, fmt)
+        except ValueError:
+            continue
+        if "%Y" not in fmt and "%y" not in fmt:
+            parsed = parsed.replace(year=datetime.now().year)
+        return parsed.strftime("%Y-%m-%d")
+    return None
+
+
+def benchmark(rounds: int = 200):
+    samples = []
+    for month in ("Jan", "May", "Jul", "Sep", "Dec"):
+        for day in range(1, 29):
+            samples += [f"Thu {month} {day}", f"{month} {day} 2025", f"{day % 12 + 1}/{day}"]
+    samples += ["July 29\n2025", "Friday May 2, 2025", "2025-05-01", "TBA"]
+    total = len(samples) * rounds
+
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for raw in samples:
+            _legacy_normalize(raw)
+    legacy = time.perf_counter() - started
+
+    today = date.today()
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for raw in samples:
+            _parse.__wrapped__(raw.strip(), today)
+    uncached = time.perf_counter() - started
+
+    _parse.cache_clear()
+    started = time.perf_counter()
+    for _ in range(rounds):
+        normalize_dates(samples, today)
+    engine = time.perf_counter() - started
+
+    print(f"{total} dates ({len(set(samples))} distinct)")
+    print(f"strptime loop        : {legacy * 1e6 / total:6.2f} µs/date")
+    print(f"patterns, no cache   : {uncached * 1e6 / total:6.2f} µs/date  ({legacy / uncached:.1f}x)")
+    print(f"date_engine (cached) : {engine * 1e6 / total:6.2f} µs/date  ({legacy / engine:.1f}x)  {cache_info()}")
+
+
+if __name__ == "__main__":
+    if "--bench" in sys.argv[1:]:
+        benchmark()
+    else:
+        for raw in sys.argv[1:]:
+            print(f"{raw!r} -> {normalize_date(raw)}")
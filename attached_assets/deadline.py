@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Time budgets for venue scrapes
+A scrape run under `deadline(seconds)` shares one clock across navigation, waiting and
+extraction: page loads, selector waits and HTTP fetches get timeouts cut to what is left, retries
+stop when there is no time for them, and extraction loops check out_of_time() between blocks.
+When the budget runs out the scrape stops cleanly and returns what it has parsed so far, and
+the venue is marked partial in scrape_metrics, so a slow site lowers coverage instead of
+losing the whole run. cut_short() tells the script it happened, and print_events marks every
+event of such a run "partial": true so readers of the output can tell it from a complete one.
+
+RESERVE seconds are held back from every budget for flushing the events (printing, submitting).
+The current deadline is a context variable, so concurrent asyncio tasks and worker threads each
+see their own. Scripts take `--budget SECONDS` or SCRAPER_BUDGET.
+"""
+
+import contextvars
+import math
+import os
+import sys
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+from scrape_metrics import METRICS
+
+RESERVE = 2.0
+
+_current = contextvars.ContextVar("scrape_deadline", default=None)
+
+
+class Deadline:
+    """A point in time `seconds` from now, RESERVE of which is kept back for flushing results"""
+
+    def __init__(self, seconds: float, reserve: float = RESERVE):
+        self.seconds = seconds
+        self.reserve = min(reserve, seconds / 4)
+        self.ends = time.perf_counter() + seconds
+        # Set once a scrape under this deadline stopped early
+        self.cut_short = False
+
+    def remaining(self) -> float:
+        """Seconds left for scraping work, not counting the reserve"""
+        return self.ends - self.reserve - time.perf_counter()
+
+
+@contextmanager
+def deadline(seconds: Optional[float]):
+    """Run the block under a time budget; None (or 0) means no budget"""
+    token = _current.set(Deadline(seconds) if seconds else None)
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+def remaining() -> float:
+    """Seconds left under the current deadline, inf when there is none"""
+    current = _current.get()
+    return current.remaining() if current is not None else math.inf
+
+
+def expired() -> bool:
+    return remaining() <= 0
+
+
+def timeout(default: float) -> float:
+    """A timeout in seconds no longer than what is left (small but positive once it has run out)"""
+    return max(min(default, remaining()), 0.001)
+
+
+def timeout_ms(default_ms: float) -> int:
+    """timeout() for Playwright, in whole ms; never 0, which Playwright reads as no timeout"""
+    return max(int(timeout(default_ms / 1000) * 1000), 1)
+
+
+def _cut_short(venue: str):
+    METRICS.partial(venue, "deadline")
+    current = _current.get()
+    if current is not None:
+        current.cut_short = True
+
+
+def cut_short() -> bool:
+    """Whether a scrape under the current deadline stopped early and returned partial events"""
+    current = _current.get()
+    return current is not None and current.cut_short
+
+
+def out_of_time(venue: str) -> bool:
+    """Checked between blocks: True (and the venue marked partial) once the deadline has passed"""
+    if not expired():
+        return False
+    _cut_short(venue)
+    return True
+
+
+@contextmanager
+def until_deadline(venue: str):
+    """A step the deadline may cut short: an error raised after it has passed ends the step quietly,
+    marks the venue partial and lets the caller extract whatever has loaded"""
+    try:
+        yield
+    except Exception as e:
+        if not expired():
+            raise
+        _cut_short(venue)
+        print(f"⏱️ {venue}: out of time ({type(e).__name__}), keeping what has loaded", file=sys.stderr)
+
+
+def _seconds(value: str, source: str) -> float:
+    try:
+        return float(value)
+    except ValueError:
+        sys.exit(f"usage: {source} takes a number of seconds, got {value!r}")
+
+
+def budget_from_argv() -> Optional[float]:
+    """--budget SECONDS (or --budget=SECONDS) from the command line, else SCRAPER_BUDGET, else None"""
+    args = sys.argv[1:]
+    for i, arg in enumerate(args):
+        if arg == "--budget":
+            if i + 1 == len(args):
+                sys.exit("usage: --budget takes a number of seconds")
+            return _seconds(args[i + 1], "--budget")
+        if arg.startswith("--budget="):
+            return _seconds(arg.split("=", 1)[1], "--budget")
+    return env_budget()
+
+
+def env_budget() -> Optional[float]:
+    """SCRAPER_BUDGET, for CLIs that parse --budget themselves, or None"""
+    value = os.environ.get("SCRAPER_BUDGET")
+    return _seconds(value, "SCRAPER_BUDGET") if value else None
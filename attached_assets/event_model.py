@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Shared event type for every scraper, plus compact on-disk formats
+Event is a __slots__ class with one canonical set of fields; to_dict() keeps the legacy
+`artist` key that the TS importers read. Event lists can be written as compact JSON, msgpack
+(pip install msgpack) or gzipped columnar JSON, and read back with load_events().
+
+`python event_model.py --bench [N]` compares memory, file size and load time against
+the dict + indent=2 JSON dumps the scrapers used to write.
+"""
+
+import gzip
+import json
+import os
+import sys
+import time
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from artist_tokenizer import tokenize_artists
+from date_engine import normalize_date
+from event_writer import slugify
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+FIELDS = ("title", "artists", "date", "time", "venue", "venue_slug", "link")
+
+
+class Event:
+    """One scraped show. `date` is YYYY-MM-DD (None if the page had no parseable date)"""
+
+    __slots__ = FIELDS
+
+    def __init__(self, title: str, date: Optional[str], venue: str, artists: Optional[Sequence[str]] = None,
+                 time: Optional[str] = None, venue_slug: Optional[str] = None, link: Optional[str] = None):
+        self.title = title
+        self.artists = tuple(artists) if artists else tuple(tokenize_artists(title))
+        self.date = date
+        self.time = time
+        self.venue = venue
+        self.venue_slug = venue_slug or slugify(venue)
+        self.link = link
+
+    @classmethod
+    def from_dict(cls, raw: Dict) -> "Event":
+        """Accept any of the drifting scraper/dump shapes (artist/title, link/url, date/sortDate, raw_text...)"""
+        return cls(
+            title=(raw.get("title") or raw.get("artist") or "").replace("\n", " ").strip(),
+            date=normalize_date(raw.get("sortDate") or raw.get("date")),
+            venue=raw.get("venue") or "",
+            artists=raw.get("artists"),
+            time=raw.get("time"),
+            venue_slug=raw.get("venue_slug"),
+            link=raw.get("link") or raw.get("ticket_url") or raw.get("url"),
+        )
+
+    def to_dict(self) -> Dict:
+        """Wire/JSON form; `artist` duplicates the title for existing consumers"""
+        data = {"artist": self.title}
+        for field in FIELDS:
+            value = getattr(self, field)
+            if value is not None:
+                data[field] = list(value) if field == "artists" else value
+        return data
+
+    def as_row(self) -> tuple:
+        return tuple(getattr(self, field) for field in FIELDS)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Event) and self.as_row() == other.as_row()
+
+    def __repr__(self) -> str:
+        return f"Event({self.title!r}, {self.date!r}, {self.venue!r})"
+
+
+def _from_row(row: Sequence) -> Event:
+    event = Event.__new__(Event)
+    for field, value in zip(FIELDS, row):
+        setattr(event, field, tuple(value) if field == "artists" else value)
+    return event
+
+
+# Columns with few distinct values are stored once and referenced by index
+DICTIONARY_COLUMNS = ("date", "time", "venue", "venue_slug")
+
+
+def _columnar(events: Sequence[Event]) -> Dict:
+    columns = {}
+    for index, field in enumerate(FIELDS):
+        values = [row[index] for row in (event.as_row() for event in events)]
+        if field == "artists":
+            values = [list(value) for value in values]
+        if field in DICTIONARY_COLUMNS:
+            lookup = {}
+            codes = [lookup.setdefault(value, len(lookup)) for value in values]
+            columns[field] = {"values": list(lookup), "codes": codes}
+        else:
+            columns[field] = values
+    return {"format": "events-columnar-1", "count": len(events), "columns": columns}
+
+
+def _from_columnar(data: Dict) -> List[Event]:
+    columns = []
+    for field in FIELDS:
+        column = data["columns"][field]
+        if isinstance(column, dict):
+            values = column["values"]
+            column = [values[code] for code in column["codes"]]
+        columns.append(column)
+    return [_from_row(row) for row in zip(*columns)]
+
+
+def dump_events(events: Iterable[Event], path: str, fmt: Optional[str] = None):
+    """Write events as "json" (compact), "msgpack" or "columnar" (gzipped); fmt defaults from the extension"""
+    events = list(events)
+    fmt = fmt or _format_for(path)
+    if fmt == "json":
+        with open(path, "w") as f:
+            json.dump([event.to_dict() for event in events], f, ensure_ascii=False, separators=(",", ":"))
+    elif fmt == "msgpack":
+        if msgpack is None:
+            raise RuntimeError("msgpack is not installed (pip install msgpack); use the columnar format")
+        with open(path, "wb") as f:
+            f.write(msgpack.packb([list(FIELDS)] + [event.as_row() for event in events]))
+    elif fmt == "columnar":
+        with gzip.open(path, "wt", encoding="utf-8") as f:
+            json.dump(_columnar(events), f, ensure_ascii=False, separators=(",", ":"))
+    else:
+        raise ValueError(f"unknown event format: {fmt}")
+
+
+def load_events(path: str, fmt: Optional[str] = None) -> List[Event]:
+    fmt = fmt or _format_for(path)
+    if fmt == "json":
+        with open(path) as f:
+            return [Event.from_dict(raw) for raw in json.load(f)]
+    if fmt == "msgpack":
+        if msgpack is None:
+            raise RuntimeError("msgpack is not installed (pip install msgpack)")
+        with open(path, "rb") as f:
+            header, *rows = msgpack.unpackb(f.read())
+        if tuple(header) != FIELDS:
+            raise ValueError(f"{path}: unexpected fields {header}")
+        return [_from_row(row) for row in rows]
+    if fmt == "columnar":
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            return _from_columnar(json.load(f))
+    raise ValueError(f"unknown event format: {fmt}")
+
+
+def _format_for(path: str) -> str:
+    if path.endswith(".msgpack"):
+        return "msgpack"
+    if path.endswith(".cols.gz"):
+        return "columnar"
+    return "json"
+
+
+def benchmark(n: int = 100_000):
+    """Memory per n events and size/load time per format, built from the bundled scrape dumps"""
+    import tempfile
+    import tracemalloc
+
+    here = os.path.dirname(os.path.abspath(__file__))
+    raws = []
+    for name in ("smart_scraped_events.json", "targeted_scraped_events.json", "aggressive_scraped_events.json"):
+        with open(os.path.join(here, name)) as f:
+            raws.extend(json.load(f))
+    # Distinct titles so nothing is shared between copies
+    raws = [dict(raws[i % len(raws)], title=f"{raws[i % len(raws)].get('title', '')} #{i}") for i in range(n)]
+
+    tracemalloc.start()
+    as_dicts = [dict(raw) for raw in raws]
+    dict_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    events = [Event.from_dict(raw) for raw in raws]
+    tracemalloc.start()
+    as_events = [_from_row(event.as_row()) for event in events]
+    event_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(f"{n} events in memory: dicts {dict_bytes / 1e6:.1f} MB, Event {event_bytes / 1e6:.1f} MB "
+          f"({dict_bytes / event_bytes:.1f}x smaller)")
+    del as_dicts, as_events
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy = os.path.join(tmp, "legacy.json")
+        started = time.perf_counter()
+        with open(legacy, "w") as f:
+            json.dump(raws, f, indent=2)
+        written = time.perf_counter() - started
+        started = time.perf_counter()
+        with open(legacy) as f:
+            json.load(f)
+        loaded = time.perf_counter() - started
+        legacy_size = os.path.getsize(legacy)
+        print(f"{'dict + indent=2 JSON':24} {legacy_size / 1e6:7.1f} MB  write {written:5.2f} s  load {loaded:5.2f} s")
+
+        formats = [("compact JSON", "events.json"), ("columnar (gzip)", "events.cols.gz")]
+        if msgpack is not None:
+            formats.insert(1, ("msgpack", "events.msgpack"))
+        else:
+            print(f"{'msgpack':24} not installed (pip install msgpack)")
+        for label, name in formats:
+            path = os.path.join(tmp, name)
+            started = time.perf_counter()
+            dump_events(events, path)
+            written = time.perf_counter() - started
+            started = time.perf_counter()
+            loaded_events = load_events(path)
+            loaded = time.perf_counter() - started
+            assert len(loaded_events) == n
+            size = os.path.getsize(path)
+            print(f"{label:24} {size / 1e6:7.1f} MB  write {written:5.2f} s  load {loaded:5.2f} s  "
+                  f"({legacy_size / size:.1f}x smaller)")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if args[:1] == ["--bench"]:
+        benchmark(int(args[1]) if len(args) > 1 else 100_000)
+    else:
+        print(f"usage: {sys.argv[0]} --bench [N]")
+        sys.exit(1)
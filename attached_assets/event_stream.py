@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Streaming importer for scraped-event dumps (the *_scraped_events.json arrays, optionally .gz)
+Decodes one array element at a time from a bounded read buffer, normalizes dates, titles and
+artists as it goes, drops repeats through an on-disk fingerprint index, and hands fixed-size
+batches to EventWriter on a separate thread. Memory stays flat however large the archive is,
+and parsing overlaps with the database round trips instead of waiting on them.
+
+    python event_stream.py [--dry-run] [--batch-size 1000] dump.json [dump2.json.gz ...]
+"""
+
+import argparse
+import gzip
+import json
+import os
+import queue
+import re
+import resource
+import tempfile
+import threading
+import time
+from datetime import date
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO
+
+from event_model import Event
+from event_writer import EventWriter, event_date, event_title
+from fingerprint_index import FingerprintIndex, fingerprint
+
+WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+
+def iter_json_array(f: TextIO, chunk_size: int = 1 << 16) -> Iterator:
+    """Yield the elements of a top-level JSON array read from `f`, holding about one element in memory"""
+    decoder = json.JSONDecoder()
+    buf = ""
+    pos = 0
+    eof = False
+    started = False
+    empty = True
+    expect_item = True
+
+    while True:
+        pos = WHITESPACE.match(buf, pos).end()
+        if pos == len(buf):
+            if eof:
+                raise ValueError("unexpected end of JSON array")
+            # Unfinished elements get longer reads so a huge one isn't re-decoded once per chunk
+            more = f.read(max(chunk_size, len(buf) - pos))
+            eof = not more
+            buf = buf[pos:] + more
+            pos = 0
+            continue
+
+        char = buf[pos]
+        if not started:
+            if char != "[":
+                raise ValueError("expected a JSON array")
+            started = True
+            pos += 1
+        elif char == "]" and (empty or not expect_item):
+            return
+        elif not expect_item:
+            if char != ",":
+                raise ValueError(f"expected ',' or ']' in JSON array, got {char!r}")
+            expect_item = True
+            pos += 1
+        else:
+            try:
+                item, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                end = None
+            # A number or literal that ends exactly at the buffer edge may be cut short
+            if end is None or (end == len(buf) and not eof):
+                more = f.read(max(chunk_size, len(buf) - pos))
+                eof = not more
+                buf = buf[pos:] + more
+                pos = 0
+                continue
+            yield item
+            empty = expect_item = False
+            pos = end
+
+
+def open_dump(path: str) -> TextIO:
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8")
+    return open(path, encoding="utf-8")
+
+
+def normalize_event(raw: Dict) -> Optional[Event]:
+    """An Event with a clean title, ISO date and artist list, or None when title or date is missing"""
+    title = event_title(raw)
+    day = event_date(raw)
+    if not title or not day:
+        return None
+    return Event(
+        title=title,
+        artists=[artist for artist in raw.get("artists") or () if artist],
+        date=day,
+        time=raw.get("time"),
+        venue=raw.get("venue") or "",
+        venue_slug=raw.get("venue_slug"),
+        link=raw.get("link") or raw.get("ticket_url") or raw.get("url"),
+    )
+
+
+class StreamImporter:
+    """Parse on the calling thread, write on a worker thread, with at most `queue_depth` batches in between"""
+
+    def __init__(self, writer: Optional[EventWriter] = None, batch_size: int = 1000, queue_depth: int = 2):
+        self.writer = writer
+        self.batch_size = batch_size
+        self.queue_depth = queue_depth
+        self.stats = {"read": 0, "queued": 0, "inserted": 0, "skipped_by_reason": {
+            "invalid": 0, "no_title_or_date": 0, "duplicate": 0}}
+        # Filled by the writer thread only; merged into stats once it has finished
+        self._written = {"inserted": 0, "skipped_by_reason": {}}
+
+    def _skip(self, reason: str, n: int = 1):
+        skipped = self.stats["skipped_by_reason"]
+        skipped[reason] = skipped.get(reason, 0) + n
+
+    def _write_batches(self, batches: "queue.Queue", errors: List[BaseException]):
+        while True:
+            batch = batches.get()
+            if batch is None:
+                return
+            if errors:
+                continue
+            try:
+                result = self.writer.write(batch)
+            except BaseException as e:
+                errors.append(e)
+                continue
+            self._written["inserted"] += result["inserted"]
+            skipped = self._written["skipped_by_reason"]
+            for reason, n in result["skipped_by_reason"].items():
+                skipped[reason] = skipped.get(reason, 0) + n
+
+    def _events(self, paths: Iterable[str], seen: FingerprintIndex) -> Iterator[Dict]:
+        for path in paths:
+            with open_dump(path) as f:
+                for raw in iter_json_array(f):
+                    self.stats["read"] += 1
+                    if not isinstance(raw, dict):
+                        self._skip("invalid")
+                        continue
+                    event = normalize_event(raw)
+                    if event is None:
+                        self._skip("no_title_or_date")
+                        continue
+                    # Same identity as fingerprint_index.event_fingerprint, without re-normalizing
+                    if event.artists:
+                        fp = fingerprint(event.venue_slug, event.date, event.artists[0])
+                        if not seen.add(fp, date.fromisoformat(event.date).toordinal()):
+                            self._skip("duplicate")
+                            continue
+                    yield event.to_dict()
+
+    def run(self, paths: Iterable[str]) -> Dict:
+        batches = queue.Queue(maxsize=self.queue_depth)
+        errors: List[BaseException] = []
+        worker = None
+        if self.writer is not None:
+            worker = threading.Thread(target=self._write_batches, args=(batches, errors), daemon=True)
+            worker.start()
+
+        # Repeats are tracked on disk so even a multi-GB archive dedupes in bounded RAM
+        with tempfile.TemporaryDirectory() as tmp, FingerprintIndex(os.path.join(tmp, "seen.idx")) as seen:
+            try:
+                batch = []
+                for event in self._events(paths, seen):
+                    batch.append(event)
+                    if len(batch) == self.batch_size:
+                        self._put(batches, batch, worker, errors)
+                        batch = []
+                if batch:
+                    self._put(batches, batch, worker, errors)
+            finally:
+                if worker is not None:
+                    batches.put(None)
+                    worker.join()
+        if errors:
+            raise errors[0]
+        self.stats["inserted"] = self._written["inserted"]
+        for reason, n in self._written["skipped_by_reason"].items():
+            if n:
+                self._skip("already_written" if reason == "duplicate" else reason, n)
+        self.stats["skipped"] = sum(self.stats["skipped_by_reason"].values())
+        return self.stats
+
+    def _put(self, batches: "queue.Queue", batch: List[Dict], worker, errors: List[BaseException]):
+        self.stats["queued"] += len(batch)
+        if worker is None:
+            return
+        if errors:
+            raise errors[0]
+        batches.put(batch)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream scraped-event dumps into the events tables")
+    parser.add_argument("paths", nargs="+", help="JSON array dumps (.json or .json.gz)")
+    parser.add_argument("--batch-size", type=int, default=1000, help="events per EventWriter.write() call")
+    parser.add_argument("--dry-run", action="store_true", help="parse, normalize and dedupe without a database")
+    args = parser.parse_args()
+
+    writer = None if args.dry_run else EventWriter(batch_size=min(args.batch_size, 500))
+    importer = StreamImporter(writer, batch_size=args.batch_size)
+    started = time.perf_counter()
+    try:
+        stats = importer.run(args.paths)
+    finally:
+        if writer is not None:
+            writer.close()
+    elapsed = time.perf_counter() - started
+
+    # ru_maxrss is KB on Linux
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"Read {stats['read']} events in {elapsed:.2f}s ({stats['read'] / elapsed if elapsed else 0:,.0f}/s), "
+          f"peak RSS {peak_mb:.0f} MB")
+    print(f"{stats['queued']} unique events {'would be written' if args.dry_run else 'written'}, "
+          f"{stats['inserted']} inserted, skipped {stats['skipped']} {stats['skipped_by_reason']}")
+
+
+if __name__ == "__main__":
+    main()
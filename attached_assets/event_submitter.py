@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Batched submission of scraped events to the backend's POST /api/events
+One pooled keep-alive session, gzip-compressed batches, bounded retries with exponential
+backoff, and an on-disk spool: batches that still fail are saved and replayed first on the next run
+
+Scraper dicts are mapped to insertEventSchema rows (venueId from GET /api/venues, the writer's
+stable slug, ISO date) just before sending; the spool keeps the scraper dicts. The backend
+inserts a batch in one transaction and skips slugs it already has, so resending is safe. A
+spooled batch the backend rejects, or fails on in MAX_ATTEMPTS runs, goes to spool/dead/ rather
+than holding up the batches behind it.
+
+EVENTS_API_URL overrides the endpoint (default http://localhost:3001/api/events).
+`python event_submitter.py` replays whatever is left in the spool.
+"""
+
+import gzip
+import json
+import os
+import time
+from typing import Dict, Iterable, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from scrape_metrics import METRICS
+from scraper_utils import log
+
+API_URL = os.environ.get("EVENTS_API_URL", "http://localhost:3001/api/events")
+
+# Headers for the batch POSTs only; GET /api/venues goes out plain
+GZIP_JSON = {"Content-Type": "application/json", "Content-Encoding": "gzip"}
+
+# Worth retrying: the backend is restarting, overloaded or briefly unreachable
+RETRY_STATUSES = frozenset([408, 429, 500, 502, 503, 504])
+# The backend itself is unavailable (rather than failing on this batch)
+DOWN_STATUSES = frozenset([502, 503, 504])
+# Runs a spooled batch may fail in before it is dead-lettered
+MAX_ATTEMPTS = 5
+
+
+class EventSubmitter:
+    def __init__(self, url: str = API_URL, batch_size: int = 100, retries: int = 3,
+                 backoff: float = 0.5, timeout: float = 10, spool_dir: str = ".scrape_state/spool"):
+        self.url = url
+        self.batch_size = batch_size
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.spool_dir = spool_dir
+        self.venues_url = url.rsplit("/events", 1)[0] + "/venues"
+        # Status of the last POST response; None when the backend couldn't be reached at all
+        self.last_status: Optional[int] = None
+        # Set when replay() found the backend unreachable or down
+        self.backend_down = False
+        self._venues = None
+        self._writer = None
+        self.session = requests.Session()
+        self.session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+        self.session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+
+    def _load_venues(self) -> Optional[Dict]:
+        if self._venues is None:
+            from event_writer import venue_index
+            try:
+                response = self.session.get(self.venues_url, timeout=self.timeout)
+                response.raise_for_status()
+                self._venues = venue_index((v["id"], v["slug"], v["name"]) for v in response.json())
+            except (requests.RequestException, ValueError, KeyError, TypeError) as e:
+                log(f"⚠️ GET {self.venues_url} failed: {type(e).__name__}")
+        return self._venues
+
+    def _rows(self, batch: List[Dict], skipped: Dict[str, int]) -> Optional[List[Dict]]:
+        """insertEventSchema rows for scraper dicts, counting the ones dropped; None if venues can't be loaded"""
+        venues = self._load_venues()
+        if venues is None:
+            return None
+        if self._writer is None:
+            from event_writer import EventWriter
+            self._writer = EventWriter()
+        rows, dropped = self._writer.prepare(batch, venues)
+        for reason, count in dropped.items():
+            skipped[reason] = skipped.get(reason, 0) + count
+        return [{
+            "title": row["title"],
+            "slug": row["slug"],
+            "venueId": row["venue_id"],
+            "date": row["date"],
+            "ticketUrl": row["ticket_url"],
+            "description": row["description"],
+            "isActive": True,
+        } for row in rows]
+
+    def _post(self, batch: List[Dict], skipped: Dict[str, int]) -> Optional[bool]:
+        """POST one batch gzipped: True if accepted, False if rejected (4xx), None if it should be retried later"""
+        self.last_status = None
+        rows = self._rows(batch, skipped)
+        if rows is None:
+            return None
+        if not rows:
+            return True
+        body = gzip.compress(json.dumps(rows, ensure_ascii=False).encode("utf-8"))
+        for attempt in range(self.retries + 1):
+            if attempt:
+                time.sleep(self.backoff * 2 ** (attempt - 1))
+            try:
+                response = self.session.post(self.url, data=body, headers=GZIP_JSON, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                self.last_status = None
+                log(f"⚠️ POST attempt {attempt + 1} failed: {type(e).__name__}")
+                continue
+            self.last_status = response.status_code
+            if response.status_code < 300:
+                return True
+            if response.status_code not in RETRY_STATUSES:
+                log(f"❌ Backend rejected batch ({response.status_code}): {response.text[:200]}")
+                return False
+            log(f"⚠️ POST attempt {attempt + 1} got {response.status_code}")
+        return None
+
+    def _spool(self, batch: List[Dict]):
+        os.makedirs(self.spool_dir, exist_ok=True)
+        path = os.path.join(self.spool_dir, f"{time.time_ns()}.json.gz")
+        with open(path + ".tmp", "wb") as f:
+            f.write(gzip.compress(json.dumps(batch, ensure_ascii=False).encode("utf-8")))
+        os.replace(path + ".tmp", path)
+
+    def _dead_letter(self, path: str, reason: str):
+        dead_dir = os.path.join(self.spool_dir, "dead")
+        os.makedirs(dead_dir, exist_ok=True)
+        os.replace(path, os.path.join(dead_dir, os.path.basename(path)))
+        log(f"🪦 Spooled batch {os.path.basename(path)} {reason}, moved to {dead_dir}")
+
+    def _failed_again(self, path: str):
+        """Count another failed run against a spooled batch: <ns>.json.gz -> <ns>.<attempts>.json.gz"""
+        stem = os.path.basename(path)[:-len(".json.gz")]
+        created, _, attempts = stem.partition(".")
+        attempts = int(attempts or 0) + 1
+        if attempts >= MAX_ATTEMPTS:
+            self._dead_letter(path, f"failed in {attempts} runs")
+        else:
+            os.replace(path, os.path.join(self.spool_dir, f"{created}.{attempts}.json.gz"))
+
+    def spooled(self) -> List[str]:
+        try:
+            names = sorted(name for name in os.listdir(self.spool_dir) if name.endswith(".json.gz"))
+        except FileNotFoundError:
+            return []
+        return [os.path.join(self.spool_dir, name) for name in names]
+
+    def replay(self, skipped: Optional[Dict[str, int]] = None) -> int:
+        """Resend spooled batches oldest first; stops once the backend is unreachable or down"""
+        skipped = {} if skipped is None else skipped
+        replayed = 0
+        self.backend_down = False
+        for path in self.spooled():
+            try:
+                with open(path, "rb") as f:
+                    batch = json.loads(gzip.decompress(f.read()))
+            except (OSError, EOFError, ValueError):
+                self._dead_letter(path, "is unreadable")
+                continue
+            accepted = self._post(batch, skipped)
+            if accepted:
+                os.remove(path)
+                replayed += 1
+            elif accepted is False:
+                self._dead_letter(path, "was rejected")
+            elif self.last_status is None or self.last_status in DOWN_STATUSES:
+                self.backend_down = True
+                break
+            else:
+                self._failed_again(path)
+        return replayed
+
+    def submit(self, events: Iterable[Dict], venue: str = "all") -> Dict[str, int]:
+        """Replay the spool, then send `events` in gzipped batches; batches that can't be delivered are spooled"""
+        events = list(events)
+        result = {"sent": 0, "rejected": 0, "spooled": 0, "replayed": 0, "skipped": 0}
+        skipped = {}
+        with METRICS.phase(venue, "post"):
+            result["replayed"] = self.replay(skipped)
+            # Once a POST this run has found the backend down, don't hammer it with the rest
+            backend_down = self.backend_down
+            for start in range(0, len(events), self.batch_size):
+                batch = events[start:start + self.batch_size]
+                dropped = sum(skipped.values())
+                accepted = None if backend_down else self._post(batch, skipped)
+                dropped = sum(skipped.values()) - dropped
+                if accepted is None:
+                    backend_down = True
+                    self._spool(batch)
+                    result["spooled"] += len(batch)
+                elif accepted:
+                    result["sent"] += len(batch) - dropped
+                else:
+                    result["rejected"] += len(batch) - dropped
+        result["skipped"] = sum(skipped.values())
+        return result
+
+    def close(self):
+        self.session.close()
+
+
+_submitter: Optional[EventSubmitter] = None
+
+
+def submit_events(events: Iterable[Dict], venue: str = "all") -> Dict[str, int]:
+    """Submit through one process-wide client so every scraper shares its connection pool"""
+    global _submitter
+    if _submitter is None:
+        _submitter = EventSubmitter()
+    result = _submitter.submit(events, venue)
+    log(f"POST {_submitter.url}: {result['sent']} sent, {result['rejected']} rejected, "
+        f"{result['skipped']} skipped, {result['spooled']} spooled, {result['replayed']} spooled batches replayed")
+    return result
+
+
+if __name__ == "__main__":
+    submitter = EventSubmitter()
+    print(f"Replayed {submitter.replay()} batches, {len(submitter.spooled())} still spooled")
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Batched Postgres writer for scraped events (shared/schema.ts events, artists, event_artists)
+Upserts many rows per statement keyed on a stable event slug (venue + date + headliner)
+and reports exactly how many rows were inserted vs already present
+
+Needs DATABASE_URL and psycopg2 (pip install psycopg2-binary).
+`python event_writer.py smart_scraped_events.json` bulk-imports a scraped-event dump.
+"""
+
+import json
+import os
+import re
+import sys
+import unicodedata
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from artist_tokenizer import tokenize_artists
+from date_engine import normalize_date
+
+# Why prepare() leaves an event out; every write result counts each of them
+SKIP_REASONS = ("duplicate", "no_date", "no_title", "unknown_venue")
+
+TRAILING_VENUE = re.compile(r'\s+at\s+.*$', re.I)
+SLUG_SPACES = re.compile(r'\s+')
+SLUG_INVALID = re.compile(r'[^a-z0-9-]')
+
+
+@lru_cache(maxsize=8192)
+def slugify(text: str) -> str:
+    """Same rule as the server importers: lowercase, spaces to dashes, drop everything else"""
+    text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii")
+    return SLUG_INVALID.sub('', SLUG_SPACES.sub('-', text.lower().strip()))
+
+
+def _venue_name_key(name: str) -> str:
+    return slugify(name).replace('-', '')
+
+
+def event_title(event: Dict) -> Optional[str]:
+    title = event.get("title") or event.get("artist")
+    if not title:
+        return None
+    return TRAILING_VENUE.sub('', title.replace('\n', ' ')).strip() or None
+
+
+def event_artists(event: Dict) -> List[str]:
+    artists = event.get("artists")
+    if artists:
+        return [artist for artist in artists if artist]
+    return tokenize_artists(event_title(event) or "")
+
+
+def event_date(event: Dict) -> Optional[str]:
+    return normalize_date(event.get("sortDate") or event.get("date"))
+
+
+def venue_index(venues: Iterable[Tuple[int, str, str]]) -> Dict[str, Tuple[int, str]]:
+    """(id, slug, name) rows -> lookup by slug and by name key, as the writer resolves venues"""
+    index = {}
+    for venue_id, slug, name in venues:
+        index[slug] = (venue_id, slug)
+        index.setdefault(_venue_name_key(name), (venue_id, slug))
+    return index
+
+
+def event_key(venue_slug: str, date: str, headliner: str) -> str:
+    """Stable identity of an event across runs and scrapers"""
+    return f"{slugify(headliner)[:60].strip('-')}-{venue_slug}-{date}"
+
+
+class EventWriter:
+    """Multi-row upserts into events/artists/event_artists, one transaction per write()"""
+
+    def __init__(self, dsn: Optional[str] = None, batch_size: int = 500):
+        self.dsn = dsn or os.environ.get("DATABASE_URL")
+        self.batch_size = batch_size
+        self._conn = None
+        self._venues: Optional[Dict[str, Tuple[int, str]]] = None
+
+    def connect(self):
+        if self._conn is None:
+            if not self.dsn:
+                raise RuntimeError("DATABASE_URL must be set to write events")
+            try:
+                import psycopg2
+            except ImportError:
+                raise RuntimeError("psycopg2 is required to write events (pip install psycopg2-binary)")
+            self._conn = psycopg2.connect(self.dsn)
+        return self._conn
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def _load_venues(self, cur) -> Dict[str, Tuple[int, str]]:
+        if self._venues is None:
+            cur.execute("SELECT id, slug, name FROM venues")
+            self._venues = venue_index(cur.fetchall())
+        return self._venues
+
+    def _resolve_venue(self, event: Dict, venues) -> Optional[Tuple[int, str]]:
+        if event.get("venue_slug") in venues:
+            return venues[event["venue_slug"]]
+        return venues.get(_venue_name_key(event.get("venue") or ""))
+
+    def prepare(self, events: Iterable[Dict], venues,
+                sources: Optional[Dict[str, List[Dict]]] = None) -> Tuple[List[Dict], Dict[str, int]]:
+        """Normalize scraper dicts into event rows; returns (rows, skipped counts by reason)
+
+        When given, `sources` is filled with slug -> the scraper dicts that became (or repeated) that row.
+        """
+        rows = {}
+        skipped = dict.fromkeys(SKIP_REASONS, 0)
+        for event in events:
+            title = event_title(event)
+            if not title:
+                skipped["no_title"] += 1
+                continue
+            date = event_date(event)
+            if not date:
+                skipped["no_date"] += 1
+                continue
+            venue = self._resolve_venue(event, venues)
+            if venue is None:
+                skipped["unknown_venue"] += 1
+                continue
+            artists = event_artists(event) or [title]
+            slug = event_key(venue[1], date, artists[0])
+            if sources is not None:
+                sources.setdefault(slug, []).append(event)
+            if slug in rows:
+                skipped["duplicate"] += 1
+                continue
+            rows[slug] = {
+                "slug": slug,
+                "title": title[:200],
+                "venue_id": venue[0],
+                "date": date,
+                "ticket_url": event.get("link") or event.get("ticket_url") or event.get("url"),
+                "description": f"Live music at {event.get('venue') or venue[1]}",
+                "artists": artists,
+            }
+        return list(rows.values()), skipped
+
+    def _upsert_events(self, cur, rows: List[Dict]) -> Dict[str, int]:
+        """Insert new events; existing slugs only get a refreshed ticket_url. Returns slug -> id of new rows"""
+        from psycopg2.extras import execute_values
+        results = execute_values(
+            cur,
+            """
+            INSERT INTO events (title, slug, venue_id, date, ticket_url, description, is_active)
+            VALUES %s
+            ON CONFLICT (slug) DO UPDATE
+                SET ticket_url = COALESCE(EXCLUDED.ticket_url, events.ticket_url)
+            RETURNING id, slug, (xmax = 0) AS inserted
+            """,
+            [(r["title"], r["slug"], r["venue_id"], r["date"], r["ticket_url"], r["description"], True)
+             for r in rows],
+            page_size=self.batch_size,
+            fetch=True,
+        )
+        return {slug: event_id for event_id, slug, inserted in results if inserted}
+
+    def _link_artists(self, cur, rows: List[Dict], new_ids: Dict[str, int]):
+        from psycopg2.extras import execute_values
+        names = {}
+        for row in rows:
+            if row["slug"] in new_ids:
+                for name in row["artists"]:
+                    names.setdefault(slugify(name), name)
+        names.pop("", None)
+        if not names:
+            return
+
+        # No-op update so RETURNING also yields ids of artists that already exist
+        artist_ids = dict((slug, artist_id) for artist_id, slug in execute_values(
+            cur,
+            """
+            INSERT INTO artists (name, slug, genre, location, description)
+            VALUES %s
+            ON CONFLICT (slug) DO UPDATE SET slug = EXCLUDED.slug
+            RETURNING id, slug
+            """,
+            [(name, slug, "indie", "San Francisco", f"{name} - Live performance") for slug, name in names.items()],
+            page_size=self.batch_size,
+            fetch=True,
+        ))
+
+        links = []
+        for row in rows:
+            event_id = new_ids.get(row["slug"])
+            if event_id is None:
+                continue
+            for order, name in enumerate(row["artists"]):
+                artist_id = artist_ids.get(slugify(name))
+                if artist_id is not None:
+                    links.append((event_id, artist_id, order == 0, order))
+        execute_values(
+            cur,
+            'INSERT INTO event_artists (event_id, artist_id, is_headliner, "order") VALUES %s',
+            links,
+            page_size=self.batch_size,
+        )
+
+    def write(self, events: Iterable[Dict]) -> Dict:
+        """Upsert events in one transaction; returns inserted/skipped counts
+
+        "stored" lists the scraper dicts whose row the database now holds, inserted or already there;
+        events skipped as no_title, no_date or unknown_venue are not in it.
+        """
+        conn = self.connect()
+        sources: Dict[str, List[Dict]] = {}
+        with conn:
+            with conn.cursor() as cur:
+                rows, skipped = self.prepare(events, self._load_venues(cur), sources)
+                inserted = 0
+                for start in range(0, len(rows), self.batch_size):
+                    batch = rows[start:start + self.batch_size]
+                    new_ids = self._upsert_events(cur, batch)
+                    self._link_artists(cur, batch, new_ids)
+                    inserted += len(new_ids)
+                    skipped["duplicate"] += len(batch) - len(new_ids)
+        stored = [event for row in rows for event in sources[row["slug"]]]
+        return {"inserted": inserted, "skipped": sum(skipped.values()), "skipped_by_reason": skipped,
+                "stored": stored}
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print(f"usage: {sys.argv[0]} events.json [...]")
+        sys.exit(1)
+    writer = EventWriter()
+    try:
+        for path in sys.argv[1:]:
+            with open(path) as f:
+                result = writer.write(json.load(f))
+            print(f"{path}: inserted {result['inserted']}, skipped {result['skipped']} {result['skipped_by_reason']}")
+    finally:
+        writer.close()
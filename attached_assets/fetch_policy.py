@@ -0,0 +1,379 @@
+#!/usr/bin/env python3
+"""
+Retry, backoff and per-host circuit breakers for venue fetches and page loads
+Retryable failures (connection errors, timeouts, 408/425/429/5xx) are retried with full-jitter
+exponential backoff. Consecutive failures open the host's breaker, which then fails fast with
+CircuitOpen instead of waiting out another timeout; after `reset_after` seconds a single probe
+request is let through (half-open) while other callers keep failing fast, and its result closes
+or re-opens the breaker. Breaker state is kept in .scrape_state/breakers.json so a dead host
+stays skipped across separate runs; worker processes share the file, and every change is merged
+into it under a file lock (state_file) so one process's failures aren't overwritten by another's.
+
+Under a scrape deadline (deadline.py), retries that wouldn't fit in the time left are skipped,
+and failures after it has passed are not held against the host.
+
+SCRAPER_HEDGE_AFTER=<seconds> turns on hedged GETs: if the first request hasn't answered by
+then, a second identical one is sent and whichever finishes first wins.
+
+POLICY.limit_hosts(n) caps requests in flight to any one host at n across every process that
+sets the same limit (the crawl coordinator's workers): each attempt holds one of the host's slot
+lock files under .scrape_state/host_slots/ only while it runs, so venues behind a shared ticketing
+host take turns per request, and a slot held by a process that dies is freed with it.
+
+Retries, hedges and breaker states are recorded per venue in scrape_metrics.
+`python fetch_policy.py` lists breaker states; `--reset` closes them all.
+"""
+
+import json
+import os
+import random
+import sys
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Awaitable, Callable, Dict, Optional, TypeVar
+from urllib.parse import urlparse
+
+from deadline import expired, remaining
+from scrape_metrics import METRICS
+from state_file import load_state, locked_state
+
+try:
+    import fcntl
+except ImportError:
+    # No advisory locks (Windows); host limits are not enforced
+    fcntl = None
+
+T = TypeVar("T")
+
+RETRY_STATUSES = frozenset([408, 425, 429, 500, 502, 503, 504])
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class CircuitOpen(Exception):
+    """The host's breaker is open; the request was not sent"""
+
+
+class HostBusy(Exception):
+    """No slot for the host came free before the scrape's deadline; the request was not sent"""
+
+
+class RetryableStatus(Exception):
+    def __init__(self, response):
+        super().__init__(f"HTTP {response.status_code} from {response.url}")
+        self.response = response
+
+
+def retryable(exc: BaseException) -> bool:
+    """Transient failures worth another attempt: network errors, timeouts and retryable statuses"""
+    if isinstance(exc, CircuitOpen):
+        return False
+    if isinstance(exc, RetryableStatus):
+        return True
+    response = getattr(exc, "response", None)
+    if response is not None and getattr(response, "status_code", None) is not None:
+        return response.status_code in RETRY_STATUSES
+    # requests' ConnectionError/Timeout, asyncio/builtin TimeoutError and Playwright's TimeoutError,
+    # matched by name so neither library has to be imported here
+    names = {cls.__name__ for cls in type(exc).__mro__}
+    return bool(names & {"ConnectionError", "Timeout", "TimeoutError", "ConnectTimeout", "ReadTimeout"})
+
+
+def host_of(url: str) -> str:
+    return urlparse(url).netloc.lower()
+
+
+class HostSlots:
+    """At most `per_host` requests in flight to one host across processes sharing `directory`"""
+
+    def __init__(self, per_host: int, directory: str = ".scrape_state/host_slots", poll: float = 0.05):
+        self.per_host = per_host
+        self.directory = directory
+        self.poll = poll
+        os.makedirs(directory, exist_ok=True)
+
+    def _try(self, host: str):
+        """An open, locked slot file for the host, or None when all of its slots are taken"""
+        for i in range(self.per_host):
+            slot = open(os.path.join(self.directory, f"{host}.{i}.lock"), "a")
+            try:
+                fcntl.flock(slot, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return slot
+            except BlockingIOError:
+                slot.close()
+        return None
+
+    def _busy(self, host: str, waited: float):
+        raise HostBusy(f"no free {host} slot within {waited:.1f}s")
+
+    @contextmanager
+    def hold(self, host: str):
+        """Wait (as long as the deadline allows) for one of the host's slots and hold it for the block"""
+        started = time.perf_counter()
+        slot = self._try(host)
+        while slot is None:
+            if self.poll >= remaining():
+                self._busy(host, time.perf_counter() - started)
+            time.sleep(self.poll)
+            slot = self._try(host)
+        try:
+            yield
+        finally:
+            slot.close()
+
+    async def hold_async(self, host: str):
+        """hold()'s wait without blocking the event loop; returns the slot file, closing it frees the slot"""
+        import asyncio
+        started = time.perf_counter()
+        slot = self._try(host)
+        while slot is None:
+            if self.poll >= remaining():
+                self._busy(host, time.perf_counter() - started)
+            await asyncio.sleep(self.poll)
+            slot = self._try(host)
+        return slot
+
+
+class FetchPolicy:
+    """Shared retry/backoff settings plus one circuit breaker per host"""
+
+    def __init__(self, retries: int = 2, backoff: float = 0.5, max_backoff: float = 8.0,
+                 failure_threshold: int = 3, reset_after: float = 300.0, hedge_after: Optional[float] = None,
+                 state_path: Optional[str] = ".scrape_state/breakers.json"):
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.failure_threshold = failure_threshold
+        self.reset_after = reset_after
+        self.hedge_after = hedge_after
+        self.state_path = state_path
+        self._lock = threading.Lock()
+        self._hedge_pool = None
+        self._slots: Optional[HostSlots] = None
+        self._breakers: Dict[str, Dict] = {}
+        # (inode, mtime) of the state file when it was last read or written here; replacing it changes the inode
+        self._seen = None
+        self._refresh()
+
+    def limit_hosts(self, per_host: int, directory: str = ".scrape_state/host_slots"):
+        """Hold one of `per_host` cross-process slots for the fetched host around every attempt"""
+        if fcntl is not None:
+            self._slots = HostSlots(per_host, directory)
+
+    def _refresh(self):
+        """Pick up breaker changes other processes have written since the file was last seen"""
+        if not self.state_path:
+            return
+        try:
+            seen = self._stat()
+        except OSError:
+            return
+        if seen != self._seen:
+            self._breakers = load_state(self.state_path)
+            self._seen = seen
+
+    def _stat(self):
+        stat = os.stat(self.state_path)
+        return stat.st_ino, stat.st_mtime_ns
+
+    @contextmanager
+    def _shared(self, host: str):
+        """The host's breaker to change, as it is on disk right now; the change is merged back under the file lock"""
+        if not self.state_path:
+            yield self._breaker(host)
+            return
+        with locked_state(self.state_path) as saved:
+            self._breakers = saved
+            yield self._breaker(host)
+        self._seen = self._stat()
+
+    def _breaker(self, host: str) -> Dict:
+        if host not in self._breakers:
+            self._breakers[host] = {"state": CLOSED, "failures": 0, "opened": 0.0, "probe": 0.0}
+        return self._breakers[host]
+
+    def state(self, host: str) -> str:
+        with self._lock:
+            return self._breaker(host)["state"]
+
+    def _allow(self, venue: str, host: str):
+        """Raise CircuitOpen while the breaker is open; once reset_after has passed, let one probe through"""
+        with self._lock:
+            self._refresh()
+            if self._breaker(host)["state"] != CLOSED:
+                with self._shared(host) as breaker:
+                    now = time.time()
+                    if breaker["state"] == OPEN and now - breaker["opened"] < self.reset_after:
+                        METRICS.breaker(venue, host, OPEN)
+                        raise CircuitOpen(f"circuit open for {host} after {breaker['failures']} failures")
+                    # A probe that hasn't reported within reset_after is presumed lost with its process
+                    if breaker["state"] == HALF_OPEN and now - breaker.get("probe", 0.0) < self.reset_after:
+                        METRICS.breaker(venue, host, HALF_OPEN)
+                        raise CircuitOpen(f"circuit half-open for {host}, waiting on its probe")
+                    if breaker["state"] != CLOSED:
+                        breaker.update(state=HALF_OPEN, probe=now)
+            METRICS.breaker(venue, host, self._breaker(host)["state"])
+
+    def _success(self, venue: str, host: str):
+        with self._lock:
+            breaker = self._breaker(host)
+            if breaker["state"] != CLOSED or breaker["failures"]:
+                with self._shared(host) as breaker:
+                    breaker.update(state=CLOSED, failures=0, probe=0.0)
+            METRICS.breaker(venue, host, CLOSED)
+
+    def _failure(self, venue: str, host: str):
+        with self._lock:
+            with self._shared(host) as breaker:
+                breaker["failures"] += 1
+                if breaker["state"] == HALF_OPEN or breaker["failures"] >= self.failure_threshold:
+                    breaker.update(state=OPEN, opened=time.time())
+            METRICS.breaker(venue, host, breaker["state"])
+
+    def _delay(self, attempt: int, exc: BaseException) -> float:
+        """Full jitter: uniform between 0 and the capped exponential step, but at least any Retry-After"""
+        delay = random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+        response = getattr(exc, "response", None)
+        retry_after = response.headers.get("Retry-After", "") if response is not None else ""
+        if retry_after.isdigit():
+            delay = max(delay, min(float(retry_after), self.max_backoff))
+        return delay
+
+    def _retry(self, venue: str, host: str, n: int, retries: int, exc: BaseException) -> Optional[float]:
+        """Book a failed attempt; returns the backoff before the next one, or None to give up and re-raise"""
+        if expired():
+            # The scrape's own time budget ran out, which says nothing about the host
+            return None
+        if not retryable(exc):
+            # The host answered (e.g. a 404 or a parse error), so it counts as up
+            self._success(venue, host)
+            return None
+        self._failure(venue, host)
+        if n == retries or self.state(host) == OPEN:
+            return None
+        delay = self._delay(n, exc)
+        if delay >= remaining():
+            return None
+        METRICS.count(venue, "retries")
+        print(f"⚠️ {venue}: {type(exc).__name__} from {host}, retry {n + 1}/{retries}", file=sys.stderr)
+        return delay
+
+    def call(self, venue: str, url: str, attempt: Callable[[], T], retries: Optional[int] = None) -> T:
+        """Run attempt() under the host's breaker (and host slot limit), retrying retryable failures with backoff"""
+        host = host_of(url)
+        retries = self.retries if retries is None else retries
+        for n in range(retries + 1):
+            self._allow(venue, host)
+            error = None
+            # The slot is held for the attempt only, never across the backoff
+            with self._slots.hold(host) if self._slots else nullcontext():
+                try:
+                    result = attempt()
+                except Exception as e:
+                    error = e
+            if error is None:
+                self._success(venue, host)
+                return result
+            delay = self._retry(venue, host, n, retries, error)
+            if delay is None:
+                raise error
+            time.sleep(delay)
+
+    async def call_async(self, venue: str, url: str, attempt: Callable[[], Awaitable[T]],
+                         retries: Optional[int] = None) -> T:
+        """call() for coroutines, e.g. a Playwright page load"""
+        import asyncio
+        host = host_of(url)
+        retries = self.retries if retries is None else retries
+        for n in range(retries + 1):
+            self._allow(venue, host)
+            error = None
+            slot = await self._slots.hold_async(host) if self._slots else None
+            try:
+                result = await attempt()
+            except Exception as e:
+                error = e
+            finally:
+                if slot is not None:
+                    slot.close()
+            if error is None:
+                self._success(venue, host)
+                return result
+            delay = self._retry(venue, host, n, retries, error)
+            if delay is None:
+                raise error
+            await asyncio.sleep(delay)
+
+    def _hedged(self, venue: str, send: Callable[[], T]) -> T:
+        """send() once, and again if the first hasn't finished after hedge_after; first success wins"""
+        from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+        with self._lock:
+            if self._hedge_pool is None:
+                self._hedge_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="hedge")
+        first = self._hedge_pool.submit(send)
+        done, _ = wait([first], timeout=self.hedge_after)
+        if done:
+            return first.result()
+        METRICS.count(venue, "hedged")
+        pending = {first, self._hedge_pool.submit(send)}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    def get(self, session, venue: str, url: str, **kwargs):
+        """session.get with retries, breaker and optional hedging; retryable statuses count as failures
+
+        Returns the response (callers still check non-retryable statuses); raises once retries run out.
+        """
+        def send():
+            response = session.get(url, **kwargs)
+            if response.status_code in RETRY_STATUSES:
+                raise RetryableStatus(response)
+            return response
+
+        if self.hedge_after:
+            return self.call(venue, url, lambda: self._hedged(venue, send))
+        return self.call(venue, url, send)
+
+    def reset(self):
+        with self._lock:
+            if not self.state_path:
+                self._breakers.clear()
+                return
+            with locked_state(self.state_path) as saved:
+                saved.clear()
+                self._breakers = saved
+            self._seen = self._stat()
+
+    def summary(self) -> Dict[str, Dict]:
+        with self._lock:
+            self._refresh()
+            return json.loads(json.dumps(self._breakers))
+
+
+def _hedge_after() -> Optional[float]:
+    value = os.environ.get("SCRAPER_HEDGE_AFTER")
+    return float(value) if value else None
+
+
+# Shared by every fetch path in the process
+POLICY = FetchPolicy(hedge_after=_hedge_after())
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] == ["--reset"]:
+        POLICY.reset()
+        print("All breakers closed")
+    else:
+        breakers = POLICY.summary()
+        if not breakers:
+            print("No hosts recorded")
+        for host, breaker in sorted(breakers.items()):
+            opened = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(breaker["opened"])) if breaker["opened"] else "-"
+            print(f"{host:32} {breaker['state']:10} {breaker['failures']:3} failures  opened {opened}")
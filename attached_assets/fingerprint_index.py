@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Persistent fingerprint index of events already written, for cross-run deduplication
+A memory-mapped open-addressing hash table of 64-bit fingerprints of (venue, date, headliner),
+each stored with its event day so past events can be expired
+
+An open index holds an exclusive lock on <path>.lock until close(), so scrapers in several
+processes take turns: the header count is only written on close and a resize swaps the file,
+neither of which is safe while another process has it mapped.
+
+`python fingerprint_index.py --bench 1000000` measures add/lookup throughput;
+`python fingerprint_index.py --expire` drops fingerprints of events before today.
+"""
+
+import hashlib
+import mmap
+import os
+import struct
+import sys
+import time
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from event_writer import event_artists, event_date, slugify
+
+try:
+    import fcntl
+except ImportError:
+    # No advisory locks (Windows); only one process may use an index at a time
+    fcntl = None
+
+MAGIC = b"FPIDX001"
+HEADER = struct.Struct("<8sQQ")   # magic, capacity, count
+SLOT = struct.Struct("<QI")       # fingerprint (0 = empty), event day ordinal
+MAX_LOAD = 0.7
+
+
+def fingerprint(venue: str, event_day: str, headliner: str) -> int:
+    key = f"{slugify(venue)}|{event_day}|{slugify(headliner)}".encode("utf-8")
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "little") or 1
+
+
+def event_fingerprint(event: Dict) -> Optional[Tuple[int, int]]:
+    """(fingerprint, day ordinal) for a scraper event dict, or None if it lacks venue/date/headliner"""
+    venue = event.get("venue_slug") or event.get("venue")
+    day = event_date(event)
+    artists = event_artists(event)
+    if not venue or not day or not artists:
+        return None
+    return fingerprint(venue, day, artists[0]), date.fromisoformat(day).toordinal()
+
+
+class FingerprintIndex:
+    def __init__(self, path: str = ".fingerprints.idx", initial_capacity: int = 1 << 16):
+        self.path = path
+        self._lock = open(path + ".lock", "a")
+        if fcntl is not None:
+            fcntl.flock(self._lock, fcntl.LOCK_EX)
+        try:
+            if not os.path.exists(path):
+                self._create(path, initial_capacity)
+            self._open()
+        except Exception:
+            self._unlock()
+            raise
+
+    @staticmethod
+    def _create(path: str, capacity: int):
+        capacity = 1 << max(capacity - 1, 1).bit_length()
+        with open(path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, capacity, 0))
+            f.truncate(HEADER.size + capacity * SLOT.size)
+
+    def _open(self):
+        self._file = open(self.path, "r+b")
+        self._mm = mmap.mmap(self._file.fileno(), 0)
+        magic, self.capacity, self.count = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{self.path} is not a fingerprint index")
+        self._mask = self.capacity - 1
+
+    def _close_map(self):
+        if self._mm is not None:
+            HEADER.pack_into(self._mm, 0, MAGIC, self.capacity, self.count)
+            self._mm.flush()
+            self._mm.close()
+            self._file.close()
+            self._mm = None
+
+    def _unlock(self):
+        if self._lock is not None:
+            if fcntl is not None:
+                fcntl.flock(self._lock, fcntl.LOCK_UN)
+            self._lock.close()
+            self._lock = None
+
+    def close(self):
+        self._close_map()
+        self._unlock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _find(self, fp: int) -> Tuple[int, bool]:
+        """Offset of fp's slot (or the empty slot where it belongs) and whether it is present"""
+        mm, mask = self._mm, self._mask
+        i = fp & mask
+        while True:
+            offset = HEADER.size + i * SLOT.size
+            stored, _ = SLOT.unpack_from(mm, offset)
+            if stored == fp:
+                return offset, True
+            if stored == 0:
+                return offset, False
+            i = (i + 1) & mask
+
+    def __contains__(self, fp: int) -> bool:
+        return self._find(fp)[1]
+
+    def add(self, fp: int, day: int) -> bool:
+        """Insert a fingerprint; returns False if it was already present"""
+        offset, found = self._find(fp)
+        if found:
+            return False
+        SLOT.pack_into(self._mm, offset, fp, day)
+        self.count += 1
+        if self.count > self.capacity * MAX_LOAD:
+            self._rebuild(self.capacity * 2)
+        return True
+
+    def _entries(self):
+        mm = self._mm
+        for i in range(self.capacity):
+            fp, day = SLOT.unpack_from(mm, HEADER.size + i * SLOT.size)
+            if fp:
+                yield fp, day
+
+    def _rebuild(self, capacity: int, min_day: int = 0):
+        """Rehash live entries (day >= min_day) into a fresh file and swap it in, still under our lock"""
+        tmp_path = self.path + ".tmp"
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        rebuilt = FingerprintIndex(tmp_path, capacity)
+        for fp, day in self._entries():
+            if day >= min_day:
+                offset, _ = rebuilt._find(fp)
+                SLOT.pack_into(rebuilt._mm, offset, fp, day)
+                rebuilt.count += 1
+        rebuilt.close()
+        os.remove(tmp_path + ".lock")
+        self._close_map()
+        os.replace(tmp_path, self.path)
+        self._open()
+
+    def expire(self, before: Optional[date] = None) -> int:
+        """Drop fingerprints of events dated before `before` (default today); returns how many"""
+        cutoff = (before or date.today()).toordinal()
+        previous = self.count
+        capacity = self.capacity
+        live = sum(1 for _, day in self._entries() if day >= cutoff)
+        while capacity > 1024 and live < capacity * MAX_LOAD / 4:
+            capacity //= 2
+        self._rebuild(capacity, cutoff)
+        return previous - self.count
+
+    def unseen(self, events: Iterable[Dict]) -> List[Dict]:
+        """Events whose fingerprint is not in the index (events without one are kept)"""
+        fresh = []
+        for event in events:
+            fp = event_fingerprint(event)
+            if fp is None or fp[0] not in self:
+                fresh.append(event)
+        return fresh
+
+    def mark_seen(self, events: Iterable[Dict]) -> int:
+        """Record events the database now holds; returns how many were new"""
+        added = 0
+        for event in events:
+            fp = event_fingerprint(event)
+            if fp is not None and self.add(*fp):
+                added += 1
+        return added
+
+
+def benchmark(n: int):
+    path = f".fingerprints-bench-{os.getpid()}.idx"
+    today = date.today().toordinal()
+    fps = [int.from_bytes(hashlib.blake2b(i.to_bytes(8, "little"), digest_size=8).digest(), "little") or 1
+           for i in range(2 * n)]
+    try:
+        with FingerprintIndex(path) as index:
+            started = time.perf_counter()
+            for i in range(n):
+                index.add(fps[i], today + i % 365)
+            added = time.perf_counter() - started
+
+            # Half hits, half misses
+            started = time.perf_counter()
+            hits = sum(1 for fp in fps[n // 2:n + n // 2] if fp in index)
+            looked_up = time.perf_counter() - started
+
+            size = os.path.getsize(path)
+            print(f"{n} fingerprints, capacity {index.capacity}, file {size / 1e6:.1f} MB")
+            print(f"add    : {added / n * 1e6:.2f} µs/op ({n / added:,.0f}/s, includes resizes)")
+            print(f"lookup : {looked_up / n * 1e6:.2f} µs/op ({n / looked_up:,.0f}/s), {hits} hits")
+
+            started = time.perf_counter()
+            removed = index.expire(date.fromordinal(today + 182))
+            print(f"expire : removed {removed} in {time.perf_counter() - started:.2f} s, {len(index)} left")
+    finally:
+        os.remove(path)
+        os.remove(path + ".lock")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if args[:1] == ["--bench"]:
+        benchmark(int(args[1]) if len(args) > 1 else 1_000_000)
+    elif args[:1] == ["--expire"]:
+        with FingerprintIndex() as index:
+            print(f"Expired {index.expire()} fingerprints, {len(index)} remain")
+    else:
+        print(f"usage: {sys.argv[0]} --bench [N] | --expire")
+        sys.exit(1)
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+HTML parser backend for the requests/BeautifulSoup scrapers
+Uses lxml when it is installed (pip install lxml) and falls back to the stdlib html.parser;
+SCRAPER_HTML_PARSER overrides the choice
+
+`python html_parser.py page.html [...]` times every available backend on saved pages.
+"""
+
+import os
+import re
+import sys
+import time
+from typing import List, Optional, Tuple
+
+from bs4 import BeautifulSoup, CData, NavigableString
+
+# Fastest first
+BACKENDS = ("lxml", "html.parser")
+
+
+def available_backends() -> List[str]:
+    backends = []
+    for backend in BACKENDS:
+        try:
+            BeautifulSoup("", backend)
+            backends.append(backend)
+        except Exception:
+            continue
+    return backends
+
+
+def _pick_backend() -> str:
+    requested = os.environ.get("SCRAPER_HTML_PARSER")
+    backends = available_backends()
+    if requested in backends:
+        return requested
+    return backends[0]
+
+
+PARSER = _pick_backend()
+
+
+def make_soup(content, parser: Optional[str] = None) -> BeautifulSoup:
+    return BeautifulSoup(content, parser or PARSER)
+
+
+TITLE_CLASS = re.compile(r'title|name', re.I)
+EVENT_HREF = re.compile(r'/event/')
+TEXT_TYPES = (NavigableString, CData)
+
+
+def scan_container(container, heading_tags, link_href=EVENT_HREF) -> Tuple[Optional[object], Optional[object], str]:
+    """Walk a container once, returning its first titled heading, first event link and full text
+
+    Replaces separate find(heading), find(link) and get_text() calls, each of which re-walks the subtree.
+    """
+    heading = link = None
+    texts = []
+    for node in container.descendants:
+        if type(node) in TEXT_TYPES:
+            texts.append(node)
+        elif heading is None and node.name in heading_tags:
+            if any(TITLE_CLASS.search(cls) for cls in node.get('class') or ()):
+                heading = node
+        elif link is None and node.name == 'a' and link_href is not None:
+            href = node.get('href')
+            if href and link_href.search(href):
+                link = node
+    return heading, link, ''.join(texts)
+
+
+def benchmark(paths: List[str], rounds: int = 5):
+    for path in paths:
+        with open(path, 'rb') as f:
+            content = f.read()
+        for backend in available_backends():
+            started = time.perf_counter()
+            for _ in range(rounds):
+                BeautifulSoup(content, backend)
+            elapsed = (time.perf_counter() - started) / rounds
+            print(f"{os.path.basename(path):40} {backend:12} {elapsed * 1000:8.1f} ms/parse")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print(f"usage: {sys.argv[0]} page.html [...]   (backend in use: {PARSER})")
+        sys.exit(1)
+    benchmark(sys.argv[1:])
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+On-disk conditional-GET cache for venue page fetches
+Stores bodies with their ETag/Last-Modified validators, so an unchanged calendar (304) costs
+no download. The cached body is parsed again on every hit rather than serving an old parse:
+shows that have passed since drop out, and the parse is measured like any other
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+import requests
+
+
+class HTTPCache:
+    """LRU-bounded cache directory: index.json + <key>.body"""
+
+    def __init__(self, cache_dir: str = ".http_cache", max_bytes: int = 50 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+        self._lock = threading.Lock()
+        self._index_path = os.path.join(cache_dir, "index.json")
+        os.makedirs(cache_dir, exist_ok=True)
+        self._index = self._load_index()
+
+    def _load_index(self) -> "OrderedDict[str, Dict]":
+        try:
+            with open(self._index_path) as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return OrderedDict()
+        # Least recently used first
+        return OrderedDict(sorted(entries.items(), key=lambda item: item[1].get("last_used", 0)))
+
+    def _save_index(self):
+        tmp_path = self._index_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self._index, f)
+        os.replace(tmp_path, self._index_path)
+
+    def _path(self, url: str, suffix: str) -> str:
+        key = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, key + suffix)
+
+    def _remove_body(self, url: str):
+        try:
+            os.remove(self._path(url, ".body"))
+        except FileNotFoundError:
+            pass
+
+    def _evict(self):
+        total = sum(entry["size"] for entry in self._index.values())
+        while total > self.max_bytes and self._index:
+            url, entry = self._index.popitem(last=False)
+            self._remove_body(url)
+            total -= entry["size"]
+            self.stats["evictions"] += 1
+
+    def _touch(self, url: str):
+        self._index[url]["last_used"] = time.time()
+        self._index.move_to_end(url)
+
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        entry = self._index.get(url)
+        if not entry:
+            return {}
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def _store(self, url: str, response: requests.Response):
+        with open(self._path(url, ".body"), "wb") as f:
+            f.write(response.content)
+        self._index[url] = {
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "size": len(response.content),
+            "last_used": time.time(),
+        }
+        self._index.move_to_end(url)
+        self._evict()
+        self._save_index()
+
+    def _load_body(self, url: str) -> Optional[bytes]:
+        try:
+            with open(self._path(url, ".body"), "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def fetch_parsed(self, session: requests.Session, url: str,
+                     parse: Callable[[bytes, str], List[Dict]], timeout: int = 15) -> List[Dict]:
+        """GET with validators; parses the cached body on 304, otherwise parses and stores the new one"""
+        with self._lock:
+            headers = self.conditional_headers(url)
+
+        response = session.get(url, headers=headers, timeout=timeout)
+
+        if response.status_code == 304:
+            with self._lock:
+                body = self._load_body(url) if url in self._index else None
+                if body is not None:
+                    self.stats["hits"] += 1
+                    self._touch(url)
+                    self._save_index()
+                else:
+                    # Validators matched but our copy is gone - drop it and refetch unconditionally
+                    self._index.pop(url, None)
+            if body is not None:
+                return parse(body, url)
+            response = session.get(url, timeout=timeout)
+
+        response.raise_for_status()
+        events = parse(response.content, url)
+        with self._lock:
+            self.stats["misses"] += 1
+            if response.headers.get("ETag") or response.headers.get("Last-Modified"):
+                self._store(url, response)
+        return events
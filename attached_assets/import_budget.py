@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Startup import budget for the scraper entry points
+Imports each entry point in a fresh interpreter under `-X importtime`, reports its cumulative
+import time with the heaviest modules it pulled in, and fails when an entry point loads a
+dependency that is meant to be imported lazily by the code that uses it. That check doesn't
+depend on the machine, so it is the gate (`npm run check:py`).
+
+Times are the median of --runs imports, each shown next to bare interpreter startup (site etc.,
+measured in the same runs and not charged to anyone) so a slow machine is visible as such. An
+entry point more than MARGIN over its budget is flagged; with --strict that fails the check too.
+
+    python import_budget.py [--runs 5] [--top 5] [--strict] [--json]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Fraction over budget a median import may run before it is flagged; single runs vary by more than 10%
+MARGIN = 0.5
+
+# entry point -> (import budget in ms, top-level packages it must not load at import time)
+BUDGETS: Dict[str, Tuple[float, Tuple[str, ...]]] = {
+    "simple_scrapers": (60, ("requests", "bs4", "lxml")),
+    "scrape_gamh_1750111350561": (60, ("playwright", "requests")),
+    "scrape_chapel_1750111325552": (60, ("playwright", "requests")),
+    "scrape_bottomofthehill_1750111297415": (60, ("playwright", "requests")),
+    "scrape_independent_1750111371800": (60, ("playwright", "requests")),
+    "scrape_independent_1750176780715": (60, ("playwright", "requests")),
+    "scrape_independent_1750178246007": (60, ("playwright", "requests")),
+    "scraper_worker": (150, ("playwright", "requests", "bs4")),
+    "playwright_runner": (150, ("playwright", "requests")),
+    "recrawl_scheduler": (60, ("playwright", "requests", "asyncio")),
+    "event_stream": (60, ("psycopg2", "requests")),
+    "crawl_coordinator": (60, ("playwright", "requests", "bs4", "asyncio")),
+    "structured_data": (60, ("playwright", "requests", "bs4")),
+    "browser_profiles": (60, ("playwright", "requests")),
+    "event_submitter": (150, ()),
+    # Its CLI always fetches and parses, so requests, bs4/lxml and asyncio load up front;
+    # playwright and psycopg2 (the database write) stay deferred
+    "improved_scrapers": (300, ("playwright", "psycopg2")),
+}
+
+
+def _parse(stderr: str) -> List[Tuple[int, int, str]]:
+    """(depth, cumulative us, module) for every `-X importtime` line"""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        entries.append((depth, int(cumulative), name.strip()))
+    return entries
+
+
+def measure(module: str) -> Dict:
+    """One fresh-interpreter import of `module`"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=HERE, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr.strip().splitlines()[-1]}")
+    entries = _parse(result.stderr)
+    # Children are listed before their parent, so everything after the last top-level
+    # interpreter-startup entry belongs to the import under test
+    start = 0
+    for i, (depth, _, name) in enumerate(entries):
+        if depth == 0 and name != module:
+            start = i + 1
+        if depth == 0 and name == module:
+            break
+    own = entries[start:]
+    startup = sum(cumulative for depth, cumulative, _ in entries[:start] if depth == 0)
+    total = next(cumulative for depth, cumulative, name in own if depth == 0 and name == module)
+    heaviest = sorted(((cumulative, name) for depth, cumulative, name in own if depth == 1), reverse=True)
+    return {
+        "ms": total / 1000,
+        "startup_ms": startup / 1000,
+        "modules": {name for _, _, name in own},
+        "heaviest": [(name, cumulative / 1000) for cumulative, name in heaviest],
+    }
+
+
+def check(module: str, runs: int, strict: bool = False) -> Dict:
+    budget, deferred = BUDGETS[module]
+    samples = sorted((measure(module) for _ in range(runs)), key=lambda sample: sample["ms"])
+    median = samples[len(samples) // 2]
+    # Any run that loads a deferred package counts, not just the median one
+    loaded = sorted({name.split(".")[0] for sample in samples for name in sample["modules"]} & set(deferred))
+    slow = median["ms"] > budget * (1 + MARGIN)
+    return {
+        "module": module,
+        "ms": round(statistics.median(sample["ms"] for sample in samples), 1),
+        "budget_ms": budget,
+        "startup_ms": round(statistics.median(sample["startup_ms"] for sample in samples), 1),
+        "eager": loaded,
+        "slow": slow,
+        "ok": not loaded and not (strict and slow),
+        "heaviest": [(name, round(ms, 1)) for name, ms in median["heaviest"]],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the scraper entry points' import time against their budgets")
+    parser.add_argument("modules", nargs="*", help=f"entry points to check (default: all {len(BUDGETS)})")
+    parser.add_argument("--runs", type=int, default=5, help="fresh imports per entry point; the median counts")
+    parser.add_argument("--top", type=int, default=5, help="heaviest direct imports to list per entry point")
+    parser.add_argument("--strict", action="store_true",
+                        help=f"also fail entry points more than {MARGIN:.0%} over their time budget")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args()
+    unknown = [module for module in args.modules if module not in BUDGETS]
+    if unknown:
+        parser.error(f"no budget for: {', '.join(unknown)}")
+
+    results = [check(module, args.runs, args.strict) for module in args.modules or BUDGETS]
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"Interpreter startup (site etc.): {statistics.median(r['startup_ms'] for r in results):.1f} ms, "
+              f"not counted below")
+        for result in results:
+            status = "❌" if not result["ok"] else "⚠️" if result["slow"] else "✅"
+            print(f"{status} {result['module']:38} {result['ms']:7.1f} ms / {result['budget_ms']:4.0f} ms budget "
+                  f"({result['ms'] / result['startup_ms']:4.1f}x startup)")
+            if result["eager"]:
+                print(f"     imported at startup but should be lazy: {', '.join(result['eager'])}")
+            for name, ms in result["heaviest"][:args.top]:
+                print(f"     {ms:7.1f} ms  {name}")
+    if not all(result["ok"] for result in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Shared Playwright page setup for the venue scrapers
+Blocks resources we never read (images, media, fonts, stylesheets, trackers) and
+records per-page load time and transferred bytes
+
+setup_page is for the sync Playwright API, setup_page_async for the async one.
+`python page_setup.py [venue ...]` loads each venue twice (legacy vs optimized) and reports the difference.
+"""
+
+import argparse
+import json
+import time
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+BLOCKED_RESOURCE_TYPES = {"image", "media", "font", "stylesheet"}
+
+# Third-party analytics, ad and popup hosts; ticketing widgets (SeeTickets, TicketWeb) are never blocked
+BLOCKED_HOSTS = (
+    "google-analytics.com",
+    "googletagmanager.com",
+    "googleadservices.com",
+    "doubleclick.net",
+    "googlesyndication.com",
+    "facebook.net",
+    "connect.facebook.com",
+    "hotjar.com",
+    "optinmonster.com",
+    "omappapi.com",
+    "omtrdc.net",
+    "newrelic.com",
+    "nr-data.net",
+    "segment.io",
+    "quantserve.com",
+    "scorecardresearch.com",
+    "tiktok.com",
+    "pinterest.com",
+    "twitter.com",
+    "snapchat.com",
+)
+
+
+def is_blocked(request) -> bool:
+    if request.resource_type in BLOCKED_RESOURCE_TYPES:
+        return True
+    host = urlparse(request.url).netloc.lower()
+    return any(host == blocked or host.endswith("." + blocked) for blocked in BLOCKED_HOSTS)
+
+
+class PageLoadStats:
+    """Load timing and transfer counters for one page visit"""
+
+    def __init__(self, venue: str, blocking: bool):
+        self.venue = venue
+        self.blocking = blocking
+        self.requests = 0
+        self.blocked = 0
+        self.bytes = 0
+        self.cached = 0
+        self.started = time.perf_counter()
+        self.load_ms: Optional[int] = None
+
+    def _on_response(self, response):
+        # Served from browser_profiles' asset cache, so nothing was transferred
+        if response.headers.get("x-scraper-cache") == "hit":
+            self.cached += 1
+            return
+        # content-length is the on-the-wire size; chunked responses without it are not counted
+        length = response.headers.get("content-length")
+        if length and length.isdigit():
+            self.bytes += int(length)
+
+    def loaded(self):
+        """Mark the point where the venue's event selector became available"""
+        self.load_ms = round((time.perf_counter() - self.started) * 1000)
+
+    def as_dict(self) -> Dict:
+        return {
+            "venue": self.venue,
+            "blocking": self.blocking,
+            "load_ms": self.load_ms,
+            "requests": self.requests,
+            "blocked_requests": self.blocked,
+            "cached_requests": self.cached,
+            "transferred_bytes": self.bytes,
+        }
+
+    def summary(self) -> str:
+        return (f"📊 {self.venue}: loaded in {self.load_ms} ms, {self.bytes / 1024:.0f} KiB over "
+                f"{self.requests} requests ({self.blocked} blocked, {self.cached} from cache)")
+
+
+def _attach(page, venue: str, block_resources: bool):
+    stats = PageLoadStats(venue, block_resources)
+
+    def handle_route(route, request):
+        if block_resources and is_blocked(request):
+            stats.blocked += 1
+            return route.abort()
+        stats.requests += 1
+        # fallback, not continue_, so context-level handlers (browser_profiles' asset cache) still see it
+        return route.fallback()
+
+    # Handlers return the route call: a no-op value under the sync API, a coroutine Playwright awaits under async
+    page.on("response", stats._on_response)
+    return stats, handle_route
+
+
+def setup_page(page, venue: str, block_resources: bool = True) -> PageLoadStats:
+    """Attach request blocking and load accounting to a sync-API page before its first goto"""
+    stats, handle_route = _attach(page, venue, block_resources)
+    page.route("**/*", handle_route)
+    return stats
+
+
+async def setup_page_async(page, venue: str, block_resources: bool = True) -> PageLoadStats:
+    """setup_page for async-API pages, where page.route is a coroutine that must finish before the goto"""
+    stats, handle_route = _attach(page, venue, block_resources)
+    await page.route("**/*", handle_route)
+    return stats
+
+
+def measure_venue(browser, venue: str, url: str, selector: Optional[str], optimized: bool) -> Dict:
+    """Load a venue once the legacy way (no blocking, network idle) or the optimized way"""
+    context = browser.new_context()
+    try:
+        page = context.new_page()
+        stats = setup_page(page, venue, block_resources=optimized)
+        if optimized:
+            page.goto(url, timeout=60000, wait_until="domcontentloaded")
+            if selector:
+                page.wait_for_selector(selector, timeout=30000)
+        else:
+            page.goto(url, timeout=60000)
+            page.wait_for_load_state("networkidle")
+        stats.loaded()
+        return stats.as_dict()
+    finally:
+        context.close()
+
+
+def measure(venues=None) -> Dict[str, Dict]:
+    from playwright.sync_api import sync_playwright
+    from playwright_runner import VENUE_MODULES
+
+    results = {}
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=True)
+        for venue, module in VENUE_MODULES.items():
+            if venues and venue not in venues:
+                continue
+            try:
+                before = measure_venue(browser, venue, module.URL, module.EVENT_SELECTOR, optimized=False)
+                after = measure_venue(browser, venue, module.URL, module.EVENT_SELECTOR, optimized=True)
+            except Exception as e:
+                print(f"❌ {venue}: {e}")
+                continue
+            results[venue] = {"before": before, "after": after}
+            print(f"{venue:12} load {before['load_ms']:>6} ms -> {after['load_ms']:>6} ms   "
+                  f"bytes {before['transferred_bytes']:>9} -> {after['transferred_bytes']:>9}")
+        browser.close()
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure venue page loads with and without resource blocking")
+    parser.add_argument("venues", nargs="*", help="venues to measure (default: all)")
+    parser.add_argument("--output", help="also write the results as JSON to this file")
+    args = parser.parse_args()
+
+    results = measure(args.venues)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+Offline parse benchmark for every venue scraper
+Serves the checked-in pages in fixtures/ (and synthetic 10x/100x copies of their event region)
+through a local requests adapter or page.set_content, so no venue site is contacted
+
+Reports events/sec, per-phase time and peak memory for each scraper and HTML backend, and
+writes them to parse_bench.json. `--baseline old.json` exits non-zero on a slowdown, and the run
+fails before timing anything if a scraper misparses a fixture (FIXTURE_CHECKS).
+
+    python parse_bench.py [--scales 1,10,100] [--rounds 3] [--output parse_bench.json] [--baseline FILE]
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import re
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+import requests
+from requests.adapters import BaseAdapter
+
+import html_parser
+import improved_scrapers
+import simple_scrapers
+from improved_scrapers import EventScraper
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+EVENTS_REGION = re.compile(r'(<!-- events:start -->)(.*?)(<!-- events:end -->)', re.S)
+NAMED_TEXT = re.compile(r'(<(?:h[1-6]|a)\b[^>]*>)([^<]+)')
+
+# fixture name -> every URL the scrapers fetch it from
+FIXTURE_URLS = {
+    "independent": ["https://www.theindependentsf.com/"],
+    "bottom": ["https://www.bottomofthehill.com/calendar.html"],
+    "cafe": ["https://www.cafedunord.com/", "https://cafedunord.com/"],
+}
+
+# (target name, fixture) for the requests/BeautifulSoup scrapers, timed with every HTML backend
+HTTP_TARGETS = [
+    ("EventScraper.scrape_independent", "independent"),
+    ("EventScraper.scrape_bottom_of_hill", "bottom"),
+    ("EventScraper.scrape_cafe_du_nord", "cafe"),
+    ("simple_scrapers.scrape_independent", "independent"),
+    ("simple_scrapers.scrape_bottom_of_hill", "bottom"),
+    ("simple_scrapers.scrape_cafe_du_nord", "cafe"),
+]
+
+# (target, fixture, event index, fields it must have) checked on the 1x fixtures, so a parser that
+# gets faster by reading the page wrong fails the run instead of looking like a win
+FIXTURE_CHECKS = [
+    ("EventScraper.scrape_bottom_of_hill", "bottom", 0, {"artists": ["The Growlers", "Wednesday"], "date": "2099-01-01"}),
+    ("EventScraper.scrape_bottom_of_hill", "bottom", 1, {"artists": ["Soccer Mommy", "Jay Som"], "date": "2099-02-06"}),
+]
+
+# Playwright scripts, keyed like playwright_runner.VENUE_MODULES; each venue key is also its fixture name
+BROWSER_VENUES = ["gamh", "chapel", "bottom", "independent"]
+
+
+def load_fixture(name: str, scale: int = 1) -> bytes:
+    """A fixture page with its event region repeated `scale` times; copies get distinct names"""
+    with open(os.path.join(FIXTURE_DIR, name + ".html"), encoding="utf-8") as f:
+        html = f.read()
+    if scale == 1:
+        return html.encode("utf-8")
+
+    def scaled(match):
+        region = match.group(2)
+        copies = [region] + [NAMED_TEXT.sub(lambda m: f"{m.group(1)}{m.group(2)} {i}", region)
+                             for i in range(1, scale)]
+        return match.group(1) + "".join(copies) + match.group(3)
+
+    return EVENTS_REGION.sub(scaled, html).encode("utf-8")
+
+
+class FixtureAdapter(BaseAdapter):
+    """requests transport that answers from in-memory pages and times every send"""
+
+    def __init__(self, pages: Dict[str, bytes]):
+        super().__init__()
+        self.pages = pages
+        self.elapsed = 0.0
+
+    def send(self, request, **kwargs):
+        started = time.perf_counter()
+        response = requests.Response()
+        response.url = request.url
+        response.request = request
+        response.status_code = 200 if request.url in self.pages else 404
+        response._content = self.pages.get(request.url, b"")
+        response.headers["Content-Type"] = "text/html; charset=utf-8"
+        response.encoding = "utf-8"
+        self.elapsed += time.perf_counter() - started
+        return response
+
+    def close(self):
+        pass
+
+
+def _http_runner(target: str, session: requests.Session) -> Callable[[], List[Dict]]:
+    owner, method = target.split(".")
+    if owner == "EventScraper":
+        scraper = EventScraper()
+        scraper.session = session
+        return getattr(scraper, method)
+    simple_scrapers.session = session
+    return getattr(simple_scrapers, method)
+
+
+def fixture_mismatches() -> List[str]:
+    """FIXTURE_CHECKS fields the scrapers got wrong"""
+    found = []
+    previous = simple_scrapers.session
+    try:
+        for target, fixture, index, expected in FIXTURE_CHECKS:
+            session = requests.Session()
+            session.mount("https://", FixtureAdapter({url: load_fixture(fixture) for url in FIXTURE_URLS[fixture]}))
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                events = _http_runner(target, session)()
+            event = events[index] if index < len(events) else {}
+            for field, value in expected.items():
+                if event.get(field) != value:
+                    found.append(f"{target} event {index} {field}: expected {value!r}, got {event.get(field)!r}")
+    finally:
+        simple_scrapers.session = previous
+    return found
+
+
+def _measure(run: Callable[[], List[Dict]], rounds: int) -> Dict:
+    """Best-of-rounds wall time plus one tracemalloc pass for peak memory"""
+    best = None
+    total = 0.0
+    events = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        events = run()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+        total += elapsed
+    tracemalloc.start()
+    run()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {"events": len(events), "seconds": best, "total_seconds": total, "peak_bytes": peak}
+
+
+@contextlib.contextmanager
+def _timed_soup(timings: List[float]):
+    """Route the scrapers' make_soup through a timer for the duration of a benchmark"""
+    def make_soup(content, parser=None):
+        started = time.perf_counter()
+        soup = html_parser.make_soup(content, parser)
+        timings.append(time.perf_counter() - started)
+        return soup
+
+    modules = (improved_scrapers, simple_scrapers)
+    previous = [module.make_soup for module in modules]
+    for module in modules:
+        module.make_soup = make_soup
+    try:
+        yield
+    finally:
+        for module, original in zip(modules, previous):
+            module.make_soup = original
+
+
+def bench_http(target: str, fixture: str, backend: str, scale: int, rounds: int) -> Dict:
+    content = load_fixture(fixture, scale)
+    adapter = FixtureAdapter({url: content for url in FIXTURE_URLS[fixture]})
+    session = requests.Session()
+    session.mount("https://", adapter)
+    previous = html_parser.PARSER, simple_scrapers.session
+    run = _http_runner(target, session)
+
+    # Phases are averaged over the timed rounds; the tracemalloc pass is left out
+    tree_timings: List[float] = []
+    html_parser.PARSER = backend
+    try:
+        with _timed_soup(tree_timings):
+            result = _measure(run, rounds)
+    finally:
+        html_parser.PARSER, simple_scrapers.session = previous
+    fetch = adapter.elapsed / (rounds + 1)
+    tree = sum(tree_timings[:rounds]) / rounds
+    total = result.pop("total_seconds") / rounds
+    result["phases"] = {
+        "fetch": fetch,
+        "tree": tree,
+        "extract": max(total - fetch - tree, 0.0),
+    }
+    return result
+
+
+def bench_browser(page, venue: str, scale: int, rounds: int) -> Dict:
+    import playwright_runner
+    module = playwright_runner.VENUE_MODULES[venue]
+    html = load_fixture(venue, scale).decode("utf-8")
+    phases = {"render": [], "extract": [], "build": []}
+
+    def run():
+        started = time.perf_counter()
+        page.set_content(html, wait_until="domcontentloaded")
+        rendered = time.perf_counter()
+        rows = page.evaluate(module.EXTRACT_JS)
+        extracted = time.perf_counter()
+        events = module.build_events(rows)
+        phases["render"].append(rendered - started)
+        phases["extract"].append(extracted - rendered)
+        phases["build"].append(time.perf_counter() - extracted)
+        return events
+
+    result = _measure(run, rounds)
+    del result["total_seconds"]
+    result["phases"] = {name: min(times) for name, times in phases.items()}
+    # tracemalloc sees only the Python side; the browser's own memory is not included
+    result["peak_bytes_scope"] = "python"
+    return result
+
+
+def _record(results: List[Dict], target: str, backend: str, scale: int, result: Dict):
+    result.update({"target": target, "backend": backend, "scale": scale})
+    if "seconds" in result:
+        result["events_per_sec"] = result["events"] / result["seconds"] if result["seconds"] else 0.0
+        phases = " ".join(f"{name} {seconds * 1000:.1f}" for name, seconds in result["phases"].items())
+        print(f"{target:40} {backend:12} {scale:>4}x {result['events']:6} events "
+              f"{result['events_per_sec']:10,.0f} ev/s  [{phases} ms]  peak {result['peak_bytes'] / 1e6:.1f} MB",
+              file=sys.stderr)
+    else:
+        print(f"{target:40} {backend:12} {scale:>4}x skipped: {result['skipped']}", file=sys.stderr)
+    results.append(result)
+
+
+def run_benchmarks(scales: List[int], rounds: int, browser: bool = True) -> List[Dict]:
+    results = []
+    # Scraper progress output would swamp the report
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for scale in scales:
+            scale_rounds = rounds if scale < 100 else 1
+            for target, fixture in HTTP_TARGETS:
+                for backend in html_parser.available_backends():
+                    _record(results, target, backend, scale,
+                            bench_http(target, fixture, backend, scale, scale_rounds))
+
+        if not browser:
+            return results
+        try:
+            from playwright.sync_api import sync_playwright
+            with sync_playwright() as p:
+                chromium = p.chromium.launch(headless=True)
+                page = chromium.new_page()
+                for scale in scales:
+                    for venue in BROWSER_VENUES:
+                        _record(results, f"playwright:{venue}", "chromium", scale,
+                                bench_browser(page, venue, scale, rounds if scale < 100 else 1))
+                chromium.close()
+        except Exception as e:
+            for scale in scales:
+                for venue in BROWSER_VENUES:
+                    _record(results, f"playwright:{venue}", "chromium", scale,
+                            {"skipped": f"browser unavailable: {str(e).splitlines()[0]}"})
+    return results
+
+
+def regressions(results: List[Dict], baseline: List[Dict], tolerance: float) -> List[str]:
+    """Targets whose events/sec fell more than `tolerance` below the baseline run"""
+    previous = {(r["target"], r["backend"], r["scale"]): r for r in baseline if "events_per_sec" in r}
+    found = []
+    for result in results:
+        old = previous.get((result["target"], result["backend"], result["scale"]))
+        if old is None or "events_per_sec" not in result:
+            continue
+        if result["events"] < old["events"]:
+            found.append(f"{result['target']} {result['backend']} {result['scale']}x: "
+                         f"{old['events']} -> {result['events']} events")
+        elif result["events_per_sec"] < old["events_per_sec"] * (1 - tolerance):
+            found.append(f"{result['target']} {result['backend']} {result['scale']}x: "
+                         f"{old['events_per_sec']:,.0f} -> {result['events_per_sec']:,.0f} events/sec")
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline fixture benchmark for the venue parsers")
+    parser.add_argument("--scales", default="1,10,100", help="comma-separated fixture scale factors")
+    parser.add_argument("--rounds", type=int, default=3, help="timed rounds per target (1 at 100x)")
+    parser.add_argument("--output", default="parse_bench.json", help="where to write the JSON results")
+    parser.add_argument("--baseline", help="earlier results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed events/sec drop versus the baseline (default 0.25)")
+    parser.add_argument("--no-browser", action="store_true", help="skip the Playwright scripts")
+    args = parser.parse_args()
+
+    mismatches = fixture_mismatches()
+    for line in mismatches:
+        print(f"❌ Fixture check: {line}", file=sys.stderr)
+    if mismatches:
+        sys.exit(1)
+
+    scales = [int(scale) for scale in args.scales.split(",")]
+    results = run_benchmarks(scales, args.rounds, browser=not args.no_browser)
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": sys.version.split()[0],
+        "backends": html_parser.available_backends(),
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {len(results)} results to {args.output}", file=sys.stderr)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            found = regressions(results, json.load(f)["results"], args.tolerance)
+        for line in found:
+            print(f"❌ Regression: {line}", file=sys.stderr)
+        if found:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Shared-browser Playwright runner for the venue scrapers
+Launches one headless Chromium and scrapes venues concurrently, each in its own long-lived
+context from browser_profiles (saved storage state, asset cache, overlays hidden up front)
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Dict, List, Optional, Tuple
+
+
+import scrape_bottomofthehill_1750111297415 as bottom_of_the_hill
+import scrape_chapel_1750111325552 as chapel
+import scrape_gamh_1750111350561 as gamh
+import scrape_independent_1750178246007 as independent
+from browser_profiles import ContextPool
+from deadline import out_of_time, timeout_ms, until_deadline
+from fetch_policy import POLICY
+from page_setup import PageLoadStats, setup_page_async
+from scrape_metrics import METRICS, profiled
+from scraper_utils import log, print_events
+from structured_data import TIERS, browser_rss_mb, fetch_structured
+
+
+# venue key -> scraper module exposing URL, EVENT_SELECTOR, EXTRACT_JS and build_events (and WIDGET
+# when the page carries a ticketing widget structured_data can read); keys match the simple_scrapers.py
+# CLI where they overlap
+VENUE_MODULES = {
+    "gamh": gamh,
+    "chapel": chapel,
+    "bottom": bottom_of_the_hill,
+    "independent": independent,
+}
+
+
+async def scrape_venue_page(page, venue: str) -> Tuple[List[Dict], PageLoadStats]:
+    """Load one venue with resource blocking, wait for its events and extract them in one pass
+
+    Under a deadline, a load or wait that runs out of time ends early and what has rendered is extracted.
+    """
+    module = VENUE_MODULES[venue]
+    stats = await setup_page_async(page, venue)
+    with METRICS.phase(venue, "render"), until_deadline(venue):
+        await page.goto(module.URL, timeout=timeout_ms(60000), wait_until="domcontentloaded")
+
+        # Normally hidden by the context's overlay rules; only a popup that still shows gets clicked
+        popup_selector = getattr(module, "POPUP_SELECTOR", None)
+        if popup_selector:
+            try:
+                popup = await page.query_selector(popup_selector)
+                if popup and await popup.is_visible():
+                    await popup.click()
+            except Exception:
+                pass
+
+        if module.EVENT_SELECTOR:
+            await page.wait_for_selector(module.EVENT_SELECTOR, timeout=timeout_ms(30000))
+    stats.loaded()
+    log(stats.summary())
+    METRICS.count(venue, "bytes", stats.bytes)
+
+    rows = []
+    with METRICS.phase(venue, "parse"), until_deadline(venue):
+        rows = await page.evaluate(module.EXTRACT_JS)
+    with METRICS.phase(venue, "normalize"):
+        events = module.build_events(rows)
+    return events, stats
+
+
+class PlaywrightRunner:
+    """One shared Chromium; each venue gets its own persistent context, at most `concurrency` loading at a time"""
+
+    def __init__(self, concurrency: int = 3):
+        self.concurrency = concurrency
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._playwright = None
+        self.browser = None
+        self.contexts: Optional[ContextPool] = None
+        self.load_stats: Dict[str, Dict] = {}
+
+    async def start(self):
+        if self.browser is None:
+            # Imported here so loading the runner (e.g. by scraper_worker) doesn't pay for Playwright up front
+            from playwright.async_api import async_playwright
+            self._playwright = await async_playwright().start()
+            self.browser = await self._playwright.chromium.launch(headless=True)
+            self.contexts = ContextPool(self.browser, max_contexts=max(8, self.concurrency))
+        return self
+
+    async def close(self):
+        if self.browser is not None:
+            await self.contexts.close()
+            await self.browser.close()
+            await self._playwright.stop()
+            self.browser = None
+            self._playwright = None
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def scrape(self, venue: str) -> List[Dict]:
+        """Scrape one venue, from its structured data over HTTP when the page has any and otherwise
+        in its context on the shared browser; a timed-out load is retried once"""
+        module = VENUE_MODULES[venue]
+        events = await asyncio.to_thread(fetch_structured, venue, module.URL, getattr(module, "WIDGET", None),
+                                         module.build_events)
+        if events is not None:
+            self.load_stats.pop(venue, None)
+            return events
+        if out_of_time(venue):
+            return []
+        await self.start()
+
+        async def attempt() -> List[Dict]:
+            started = time.perf_counter()
+            async with self.contexts.lease(venue, module) as context:
+                page = await context.new_page()
+                try:
+                    events, stats = await scrape_venue_page(page, venue)
+                    self.load_stats[venue] = stats.as_dict()
+                    TIERS.record(venue, "browser", (time.perf_counter() - started) * 1000, stats.bytes,
+                                 browser_rss_mb())
+                    return events
+                finally:
+                    await page.close()
+
+        async with self._semaphore:
+            return await POLICY.call_async(venue, VENUE_MODULES[venue].URL, attempt, retries=1)
+
+    async def scrape_all(self, venues: Optional[List[str]] = None) -> Dict[str, List[Dict]]:
+        """Scrape venues concurrently; a failing venue yields [] instead of failing the run"""
+        venues = venues or list(VENUE_MODULES)
+
+        async def run(venue: str) -> List[Dict]:
+            try:
+                events = await self.scrape(venue)
+                log(f"✅ {venue}: {len(events)} events")
+                return events
+            except Exception as e:
+                log(f"❌ {venue}: {e}")
+                return []
+
+        results = await asyncio.gather(*(run(venue) for venue in venues))
+        return dict(zip(venues, results))
+
+
+async def scrape_venues(venues: Optional[List[str]] = None, concurrency: int = 3) -> Dict[str, List[Dict]]:
+    async with PlaywrightRunner(concurrency) as runner:
+        return await runner.scrape_all(venues)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scrape Playwright venues with one shared browser")
+    parser.add_argument("venues", nargs="*", help=f"venues to scrape: {', '.join(VENUE_MODULES)} (default: all)")
+    parser.add_argument("--concurrency", type=int, default=3, help="max venues loading at once")
+    parser.add_argument("--ndjson", action="store_true", help="stream one compact JSON event per line, logs on stderr")
+    args = parser.parse_args()
+    unknown = [venue for venue in args.venues if venue not in VENUE_MODULES]
+    if unknown:
+        parser.error(f"unknown venue(s): {', '.join(unknown)}")
+
+    with profiled("playwright_runner"):
+        results = asyncio.run(scrape_venues(args.venues or None, args.concurrency))
+    print_events([event for venue_events in results.values() for event in venue_events])
+    METRICS.emit()
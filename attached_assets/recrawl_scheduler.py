@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Adaptive per-venue recrawl scheduler
+Remembers, per venue, whether each scrape changed the extracted event set and what it cost,
+and spaces crawls out accordingly: the interval doubles after every unchanged scrape and halves
+after a change, between MIN_INTERVAL and MAX_INTERVAL. It is held at BASE_INTERVAL (the fixed
+cadence every venue used to get) for a few days after new shows are announced, which is when
+tickets go on sale and listings move, and while a show is only a day or two away.
+
+A scrape that comes back empty is not an observation: it is far more often a failed fetch than
+a venue with nothing on, so it leaves the digest and interval alone. The state file is shared
+by the worker and crawl coordinator processes and updated under a file lock (state_file).
+
+    python recrawl_scheduler.py [--horizon 24] [--budget 3]   upcoming schedule and scrape-minutes saved
+    python recrawl_scheduler.py --run                          scrape the venues that are due now
+"""
+
+import argparse
+import hashlib
+import heapq
+import threading
+import time
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from event_writer import event_date, event_title
+from state_file import load_state, locked_state
+
+HOUR = 3600
+MIN_INTERVAL = 1 * HOUR
+BASE_INTERVAL = 6 * HOUR
+MAX_INTERVAL = 72 * HOUR
+BACKOFF = 2.0
+# Weight of the latest scrape in the change-rate and cost averages
+SMOOTHING = 0.3
+# How long after an announcement crawls stay at BASE_INTERVAL (on-sales usually follow within days)
+ON_SALE_WINDOW = 3 * 24 * HOUR
+SOON_DAYS = 2
+# Assumed scrape cost before a venue has been timed
+DEFAULT_COST = 30.0
+
+# venue key -> scraper_worker source; every venue the worker knows
+VENUE_SOURCES = {
+    "gamh": "browser",
+    "chapel": "browser",
+    "bottom": "browser",
+    "independent": "browser",
+    "cafe": "simple",
+}
+
+
+def event_set(events: Iterable[Dict]) -> List[str]:
+    """Sorted identities of an extracted event set, insensitive to page order and formatting"""
+    keys = set()
+    for event in events:
+        keys.add(f"{event_date(event)}|{event_title(event)}|{event.get('link') or event.get('url') or ''}")
+    return sorted(keys)
+
+
+class RecrawlScheduler:
+    """Per-venue change rate, cost and next crawl time, persisted as JSON"""
+
+    def __init__(self, path: str = ".scrape_state/recrawl.json"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._state = load_state(path)
+
+    def venue(self, venue: str) -> Dict:
+        return self._state.get(venue) or {
+            "runs": 0,
+            "changes": 0,
+            "change_rate": 1.0,
+            "cost": DEFAULT_COST,
+            "interval": BASE_INTERVAL,
+            "last_crawl": None,
+            "next_crawl": 0.0,
+            "announced": 0.0,
+            "next_show": None,
+            "digest": None,
+            "size": 0,
+        }
+
+    @staticmethod
+    def _held(state: Dict, at: float) -> bool:
+        """Whether crawls at time `at` stay at BASE_INTERVAL: recent announcements or a show coming up"""
+        soon = (date.fromtimestamp(at) + timedelta(days=SOON_DAYS)).isoformat()
+        return at - state["announced"] < ON_SALE_WINDOW or bool(state["next_show"] and state["next_show"] <= soon)
+
+    def _interval(self, state: Dict, changed: bool, now: float) -> float:
+        interval = state["interval"] / BACKOFF if changed else state["interval"] * BACKOFF
+        interval = min(max(interval, MIN_INTERVAL), MAX_INTERVAL)
+        if self._held(state, now):
+            interval = min(interval, BASE_INTERVAL)
+        return interval
+
+    def record(self, venue: str, events: List[Dict], seconds: float, now: Optional[float] = None) -> Dict:
+        """Log one finished scrape and schedule the next; returns the venue's updated state"""
+        now = now or time.time()
+        keys = event_set(events)
+        digest = hashlib.sha1("\n".join(keys).encode("utf-8")).hexdigest()
+        with self._lock, locked_state(self.path) as saved:
+            # Other processes may have recorded venues since this one loaded the file
+            self._state.update(saved)
+            state = dict(self.venue(venue))
+            if not keys:
+                # Most likely a failed fetch: try again after the same interval, learn nothing from it
+                state["empty_runs"] = state.get("empty_runs", 0) + 1
+                state["next_crawl"] = now + state["interval"]
+                self._state[venue] = saved[venue] = state
+                return state
+            first = state["digest"] is None
+            changed = not first and digest != state["digest"]
+            if changed and len(keys) > state["size"]:
+                state["announced"] = now
+            upcoming = [key[:10] for key in keys if key[:10] >= date.today().isoformat()]
+            state["next_show"] = min(upcoming) if upcoming else None
+
+            state["runs"] += 1
+            state["changes"] += changed
+            if not first:
+                state["change_rate"] += SMOOTHING * (changed - state["change_rate"])
+            state["cost"] = seconds if first else state["cost"] + SMOOTHING * (seconds - state["cost"])
+            state["interval"] = BASE_INTERVAL if first else self._interval(state, changed, now)
+            state["last_crawl"] = now
+            state["next_crawl"] = now + state["interval"]
+            state["digest"] = digest
+            state["size"] = len(keys)
+            self._state[venue] = saved[venue] = state
+        return state
+
+    def due(self, venues: Iterable[str] = VENUE_SOURCES, now: Optional[float] = None) -> List[str]:
+        """Venues whose next crawl has come, the most frequently changing (then most overdue) first"""
+        now = now or time.time()
+        ready = [(venue, self.venue(venue)) for venue in venues]
+        ready = [(venue, state) for venue, state in ready if state["next_crawl"] <= now]
+        ready.sort(key=lambda item: (-item[1]["change_rate"], item[1]["next_crawl"]))
+        return [venue for venue, _ in ready]
+
+    def plan(self, horizon: float = 24 * HOUR, budget: int = 3, venues: Iterable[str] = VENUE_SOURCES,
+             now: Optional[float] = None) -> List[Tuple[float, str, float]]:
+        """(start, venue, cost) for every crawl in the next `horizon` seconds, at most `budget` at once
+
+        Assumes nothing changes, so each venue keeps backing off; a change only brings crawls forward.
+        """
+        now = now or time.time()
+        pending = []
+        for venue in venues:
+            state = self.venue(venue)
+            heapq.heappush(pending, (max(state["next_crawl"], now), venue, state["interval"]))
+        slots = [now] * budget
+        crawls = []
+        while pending:
+            wanted, venue, interval = heapq.heappop(pending)
+            if wanted >= now + horizon:
+                break
+            state = self.venue(venue)
+            start = max(wanted, heapq.heappop(slots))
+            heapq.heappush(slots, start + state["cost"])
+            crawls.append((start, venue, state["cost"]))
+            interval = min(interval * BACKOFF, MAX_INTERVAL)
+            if self._held(state, start):
+                interval = min(interval, BASE_INTERVAL)
+            heapq.heappush(pending, (start + interval, venue, interval))
+        return crawls
+
+    def savings(self, horizon: float = 24 * HOUR, budget: int = 3, venues: Iterable[str] = VENUE_SOURCES,
+                now: Optional[float] = None) -> Dict[str, float]:
+        """Scrape-minutes over the horizon at the fixed BASE_INTERVAL cadence versus the adaptive plan"""
+        venues = list(venues)
+        fixed = sum(horizon / BASE_INTERVAL * self.venue(venue)["cost"] for venue in venues)
+        adaptive = sum(cost for _, _, cost in self.plan(horizon, budget, venues, now))
+        return {"fixed_minutes": fixed / 60, "adaptive_minutes": adaptive / 60, "saved_minutes": (fixed - adaptive) / 60}
+
+
+def _duration(seconds: float) -> str:
+    if seconds < HOUR:
+        return f"{seconds / 60:.0f}m"
+    return f"{seconds / HOUR:.1f}h"
+
+
+def show_schedule(scheduler: RecrawlScheduler, horizon: float, budget: int):
+    now = time.time()
+    print(f"{'venue':12} {'runs':>5} {'change':>7} {'cost':>7} {'interval':>9}  next crawl")
+    for venue in VENUE_SOURCES:
+        state = scheduler.venue(venue)
+        wait = state["next_crawl"] - now
+        print(f"{venue:12} {state['runs']:5} {state['change_rate']:7.0%} {state['cost']:6.1f}s "
+              f"{_duration(state['interval']):>9}  {'due now' if wait <= 0 else 'in ' + _duration(wait)}")
+
+    print(f"\nNext {_duration(horizon)} with at most {budget} concurrent scrapes:")
+    for start, venue, cost in scheduler.plan(horizon, budget, now=now):
+        print(f"  +{_duration(start - now):>6}  {venue:12} ~{cost:.0f}s")
+    saved = scheduler.savings(horizon, budget, now=now)
+    print(f"\nScrape time over {_duration(horizon)}: {saved['adaptive_minutes']:.1f} min adaptive vs "
+          f"{saved['fixed_minutes']:.1f} min every {_duration(BASE_INTERVAL)} — {saved['saved_minutes']:.1f} min saved")
+
+
+async def run_due(scheduler: RecrawlScheduler, budget: int) -> Dict[str, int]:
+    """Scrape every due venue through the worker's scrape path, at most `budget` at once, and record each run"""
+    import asyncio
+    from scraper_worker import ScraperWorker
+
+    worker = ScraperWorker(None, concurrency=budget)
+    semaphore = asyncio.Semaphore(budget)
+    results = {}
+
+    async def crawl(venue: str):
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                events = await worker.scrape(venue, VENUE_SOURCES[venue])
+            except Exception as e:
+                print(f"❌ {venue}: {e}")
+                return
+            state = scheduler.record(venue, events, time.perf_counter() - started)
+            results[venue] = len(events)
+            print(f"✅ {venue}: {len(events)} events, next crawl in {_duration(state['interval'])}")
+
+    try:
+        await asyncio.gather(*(crawl(venue) for venue in scheduler.due()))
+    finally:
+        await worker.runner.close()
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Show or run the adaptive per-venue recrawl schedule")
+    parser.add_argument("--horizon", type=float, default=24, help="hours of schedule to show (default 24)")
+    parser.add_argument("--budget", type=int, default=3, help="max concurrent scrapes (default 3)")
+    parser.add_argument("--run", action="store_true", help="scrape the venues that are due now")
+    args = parser.parse_args()
+
+    scheduler = RecrawlScheduler()
+    if args.run:
+        import asyncio
+        due = scheduler.due()
+        print(f"Due: {', '.join(due) or 'nothing'}")
+        asyncio.run(run_due(scheduler, args.budget))
+    show_schedule(scheduler, args.horizon * HOUR, args.budget)
@@ -1,67 +1,97 @@
-from playwright.sync_api import sync_playwright
-import requests
-from datetime import datetime
-import re
+from scraper_utils import log, emit_event, print_events
+from date_engine import normalize_date
+from event_model import Event
+from page_setup import setup_page
+from fetch_policy import POLICY
+from scrape_metrics import METRICS, profiled
+from deadline import budget_from_argv, deadline, out_of_time, timeout_ms, until_deadline
+
+URL = "https://www.bottomofthehill.com/calendar.html"
+# Static calendar HTML - the event cells exist as soon as the DOM is parsed, nothing to wait for
+EVENT_SELECTOR = None
 
 def extract_date_from_text(text: str):
     """Extract a date like 'May 1 2025' from a text block."""
-    match = re.search(r'([A-Z][a-z]+ \d{1,2},? 20\d{2})', text)
-    if match:
-        try:
-            return datetime.strptime(match.group(1).replace(',', ''), "%B %d %Y").strftime("%Y-%m-%d")
-        except:
-            return None
-    return None
-
-def scrape_bottom_of_the_hill():
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        page = browser.new_page()
-        print("⏳ Loading Bottom of the Hill page...")
-        page.goto("https://www.bottomofthehill.com/calendar.html", timeout=60000)
+    return normalize_date(text)
 
-        event_blocks = page.query_selector_all("td[style*='background-color: rgb(204, 204, 51)']")
-        print(f"✅ Found {len(event_blocks)} event blocks")
+# One in-page pass returns every block's text and band names, instead of a browser round trip per field
+EXTRACT_JS = """
+() => Array.from(document.querySelectorAll("td[style*='background-color: rgb(204, 204, 51)']"), block => ({
+    text: block.innerText.trim(),
+    bands: Array.from(block.querySelectorAll("big.band"), el => el.innerText.trim())
+}))
+"""
 
-        events = []
+def build_events(rows):
+    """Turn EXTRACT_JS rows into event dicts"""
+    METRICS.count("bottom", "blocks", len(rows))
+    events = []
+    for i, row in enumerate(rows):
+        if out_of_time("bottom"):
+            break
+        text = row["text"]
+        date = extract_date_from_text(text)
 
-        for i, block in enumerate(event_blocks):
-            text = block.inner_text().strip()
-            date = extract_date_from_text(text)
+        # Extract artist(s)
+        artists = [band.upper() for band in row["bands"]]
+        artist_string = ", ".join(artists) if artists else ""
 
-            # Extract artist(s)
-            band_els = block.query_selector_all("big.band")
-            artists = [el.inner_text().strip().upper() for el in band_els]
-            artist_string = ", ".join(artists) if artists else ""
+        # Extract time info
+        time_lines = [line for line in text.splitlines() if "door" in line.lower() or "music" in line.lower()]
+        show_time = time_lines[0].replace('\xa0', ' ').strip() if time_lines else ""
 
-            # Extract time info
-            time_lines = [line for line in text.splitlines() if "door" in line.lower() or "music" in line.lower()]
-            show_time = time_lines[0].replace('\xa0', ' ').strip() if time_lines else ""
+        # Only keep events with both date and artist
+        if date and artist_string:
+            log(f"📅 [Block {i}] Extracted date: {date}")
+            log(f"✅ [Block {i}] Parsed event: {artist_string} on {date}")
+            event = Event(
+                title=artist_string,
+                artists=artists,
+                date=date,
+                time=show_time,
+                venue="Bottom of the Hill",
+                link="https://www.bottomofthehill.com/calendar.html"
+            ).to_dict()
+            events.append(event)
+            emit_event(event)
+        else:
+            METRICS.skip("bottom", "no_date" if artist_string else "no_artist")
+            log(f"⚠️ [Block {i}] Skipping: Incomplete data — date: {date}, artist: {artist_string}, time: {show_time}")
+    METRICS.count("bottom", "kept", len(events))
+    return events
 
-            # Only keep events with both date and artist
-            if date and artist_string:
-                print(f"📅 [Block {i}] Extracted date: {date}")
-                print(f"✅ [Block {i}] Parsed event: {artist_string} on {date}")
-                events.append({
-                    "artist": artist_string,
-                    "date": date,
-                    "time": show_time,
-                    "venue": "Bottom of the Hill",
-                    "link": "https://www.bottomofthehill.com/calendar.html"
-                })
-            else:
-                print(f"⚠️ [Block {i}] Skipping: Incomplete data — date: {date}, artist: {artist_string}, time: {show_time}")
+def scrape_bottom_of_the_hill():
+    # Playwright (and requests, for the POST) load only when a scrape actually runs
+    from playwright.sync_api import sync_playwright
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=True)
+        page = browser.new_page()
+        stats = setup_page(page, "bottom")
+        log("⏳ Loading Bottom of the Hill page...")
+        with METRICS.phase("bottom", "render"), until_deadline("bottom"):
+            # A timed-out load is retried once; an open breaker fails fast instead.
+            # Past the deadline, whatever has rendered so far is extracted
+            POLICY.call("bottom", URL,
+                        lambda: page.goto(URL, timeout=timeout_ms(60000), wait_until="domcontentloaded"), retries=1)
+        stats.loaded()
+        log(stats.summary())
+        METRICS.count("bottom", "bytes", stats.bytes)
 
-        print(events)
+        rows = []
+        with METRICS.phase("bottom", "parse"), until_deadline("bottom"):
+            rows = page.evaluate(EXTRACT_JS)
+        log(f"✅ Found {len(rows)} event blocks")
 
-        try:
-            response = requests.post("http://localhost:3001/api/events", json=events)
-            print(f"POST status: {response.status_code}")
-            print(f"Response: {response.text}")
-        except requests.exceptions.ConnectionError:
-            print("❌ Could not connect to localhost:3001 — skipping POST.")
+        with METRICS.phase("bottom", "normalize"):
+            events = build_events(rows)
 
         browser.close()
 
+    print_events(events)
+    from event_submitter import submit_events
+    submit_events(events, venue="bottom")
+
 if __name__ == "__main__":
-    scrape_bottom_of_the_hill()
+    with profiled("bottom"), deadline(budget_from_argv()):
+        scrape_bottom_of_the_hill()
+    METRICS.emit()
@@ -1,62 +1,99 @@
-import json
-from datetime import datetime
-from playwright.sync_api import sync_playwright
-from scraper_utils import insert_unique_events
+from scraper_utils import insert_unique_events, log, emit_event, print_events
+from date_engine import parse_date
+from event_model import Event
+from page_setup import setup_page
+from fetch_policy import POLICY
+from scrape_metrics import METRICS, profiled
+from deadline import budget_from_argv, deadline, out_of_time, timeout_ms, until_deadline
+
+URL = "https://thechapelsf.com/music/"
+EVENT_SELECTOR = ".event-info-block"
 
 def normalize_and_format_date(date_str):
-    try:
-        parsed = datetime.strptime(date_str, "%a %b %d")
-        parsed = parsed.replace(year=2025)  # You can make this dynamic if needed
-        return {
-            "display": parsed.strftime("%a %b %d"),
-            "sort": parsed.strftime("%Y-%m-%d")
-        }
-    except Exception as e:
-        print(f"❌ Failed to parse date: {date_str} — {e}")
+    parsed = parse_date(date_str)
+    if parsed is None:
+        log(f"❌ Failed to parse date: {date_str}")
         return { "display": date_str, "sort": None }
+    return {
+        "display": parsed.strftime("%a %b %d"),
+        "sort": parsed.strftime("%Y-%m-%d")
+    }
+
+# One in-page pass returns every field of every block, instead of a browser round trip per field
+EXTRACT_JS = """
+() => Array.from(document.querySelectorAll(".event-info-block"), item => {
+    const title = item.querySelector("p.title a");
+    const date = item.querySelector("p.date");
+    const link = title || item.querySelector("a");
+    const time = Array.from(item.querySelectorAll("p"), p => p.innerText.trim())
+        .find(text => text.includes("Doors at") || text.includes("Show at"));
+    return {
+        artist: title ? title.innerText.trim() : null,
+        date: date ? date.innerText.trim() : null,
+        time: time || null,
+        link: link ? link.getAttribute("href") : null
+    };
+})
+"""
+
+def build_events(rows):
+    """Turn EXTRACT_JS rows into event dicts"""
+    METRICS.count("chapel", "blocks", len(rows))
+    events = []
+    for row in rows:
+        if out_of_time("chapel"):
+            break
+        normalized = normalize_and_format_date(row["date"])
+
+        event = Event(
+            title=row["artist"],
+            date=normalized["sort"],
+            time=row["time"],
+            venue="The Chapel",
+            link=row["link"]
+        ).to_dict()
+        # sortDate is kept for readers of the old output; an unparseable date keeps the page's text
+        event["sortDate"] = normalized["sort"]
+        if normalized["sort"] is None:
+            event["date"] = row["date"]
+        events.append(event)
+        emit_event(event)
+    METRICS.count("chapel", "kept", len(events))
+    return events
+
+def load_page(page):
+    page.goto(URL, timeout=timeout_ms(60000), wait_until="domcontentloaded")
+    page.wait_for_selector(EVENT_SELECTOR, timeout=timeout_ms(30000))
 
 def scrape_chapel_events():
+    # Playwright loads only when a scrape actually runs, not when build_events is imported
+    from playwright.sync_api import sync_playwright
     with sync_playwright() as p:
         browser = p.chromium.launch(headless=True)
         page = browser.new_page()
-        page.goto("https://thechapelsf.com/music/", timeout=60000)
-        page.wait_for_load_state("networkidle")
-
-        event_items = page.query_selector_all(".event-info-block")
-        print(f"Found {len(event_items)} events")
-
-        events = []
-        for item in event_items:
-            title_el = item.query_selector("p.title a")
-            date_el = item.query_selector("p.date")
-
-            # Updated time extraction
-            time_el = None
-            paragraphs = item.query_selector_all("p")
-            for p in paragraphs:
-                text = p.inner_text().strip()
-                if "Doors at" in text or "Show at" in text:
-                    time_el = text
-                    break
-
-            link_el = title_el or item.query_selector("a")
-
-            raw_date = date_el.inner_text().strip() if date_el else None
-            normalized = normalize_and_format_date(raw_date)
-
-            events.append({
-                "artist": title_el.inner_text().strip() if title_el else None,
-                "date": normalized["display"],
-                "sortDate": normalized["sort"],
-                "time": time_el,
-                "venue": "The Chapel",
-                "link": link_el.get_attribute("href") if link_el else None
-            })
+        stats = setup_page(page, "chapel")
+        with METRICS.phase("chapel", "render"), until_deadline("chapel"):
+            # A timed-out load is retried once; an open breaker fails fast instead.
+            # Past the deadline, whatever has rendered so far is extracted
+            POLICY.call("chapel", URL, lambda: load_page(page), retries=1)
+        stats.loaded()
+        log(stats.summary())
+        METRICS.count("chapel", "bytes", stats.bytes)
+
+        rows = []
+        with METRICS.phase("chapel", "parse"), until_deadline("chapel"):
+            rows = page.evaluate(EXTRACT_JS)
+        log(f"Found {len(rows)} events")
+
+        with METRICS.phase("chapel", "normalize"):
+            events = build_events(rows)
 
         browser.close()
 
-    print(json.dumps(events, indent=2))
-    insert_unique_events(events)
+    print_events(events)
+    insert_unique_events(events, venue="chapel")
 
 if __name__ == "__main__":
-    scrape_chapel_events()
+    with profiled("chapel"), deadline(budget_from_argv()):
+        scrape_chapel_events()
+    METRICS.emit()
@@ -1,64 +1,108 @@
-from playwright.sync_api import sync_playwright
-import requests
-from datetime import datetime
-import re
+import time
 
-def parse_date(text):
-    try:
-        parts = text.strip().split()
-        if len(parts) == 3:  # e.g., "Thu May 1"
-            month = datetime.strptime(parts[1], "%b").month
-            day = int(parts[2])
-            year = datetime.now().year
-            return datetime(year, month, day).strftime("%Y-%m-%d")
-    except:
-        return None
+from scraper_utils import log, emit_event, print_events
+from date_engine import normalize_date
+from event_model import Event
+from page_setup import setup_page
+from fetch_policy import POLICY
+from scrape_metrics import METRICS, profiled
+from deadline import budget_from_argv, deadline, out_of_time, timeout_ms, until_deadline
+from structured_data import TIERS, browser_rss_mb, fetch_structured
 
-def scrape_gamh_events():
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        page = browser.new_page()
-        print("⏳ Loading GAMH page...")
-        page.goto("https://gamh.com/", timeout=60000)
-        page.wait_for_selector("div.seetickets-list-event-container", timeout=30000)
+URL = "https://gamh.com/"
+EVENT_SELECTOR = "div.seetickets-list-event-container"
+# The SeeTickets list is in the served HTML, so structured_data can usually read it without a browser
+WIDGET = "seetickets"
 
-        event_blocks = page.query_selector_all("div.seetickets-list-event-container")
-        print(f"✅ Found {len(event_blocks)} events")
+def parse_date(text):
+    """Normalize a SeeTickets date like "Thu May 1" to YYYY-MM-DD"""
+    return normalize_date(text)
 
-        events = []
+# One in-page pass returns every field of every block, instead of a browser round trip per field
+EXTRACT_JS = """
+() => Array.from(document.querySelectorAll("div.seetickets-list-event-container"), block => {
+    const text = sel => { const el = block.querySelector(sel); return el ? el.innerText.trim() : null; };
+    const title = block.querySelector("p.event-title a");
+    return {
+        artist: title ? title.innerText.trim() : null,
+        link: title ? title.getAttribute("href") : null,
+        date: text("p.event-date"),
+        time: text("p.doortime-showtime")
+    };
+})
+"""
 
-        for block in event_blocks:
-            title_el = block.query_selector("p.event-title a")
-            date_el = block.query_selector("p.event-date")
-            time_el = block.query_selector("p.doortime-showtime")
+def build_events(rows):
+    """Turn EXTRACT_JS rows into event dicts"""
+    METRICS.count("gamh", "blocks", len(rows))
+    events = []
+    for row in rows:
+        if out_of_time("gamh"):
+            break
+        artist = row["artist"]
+        date = parse_date(row["date"])
 
-            artist = title_el.inner_text().strip() if title_el else None
-            link = title_el.get_attribute("href") if title_el else None
-            raw_date = date_el.inner_text().strip() if date_el else None
-            date = parse_date(raw_date)
-            time = time_el.inner_text().strip() if time_el else None
+        if artist and date:
+            event = Event(
+                title=artist.upper(),
+                date=date,
+                time=row["time"],
+                venue="Great American Music Hall",
+                link=row["link"]
+            ).to_dict()
+            events.append(event)
+            emit_event(event)
+        else:
+            METRICS.skip("gamh", "no_date" if artist else "no_artist")
+            log("⚠️ Skipping incomplete event block")
+    METRICS.count("gamh", "kept", len(events))
+    return events
 
-            if artist and date:
-                events.append({
-                    "artist": artist.upper(),
-                    "date": date,
-                    "time": time,
-                    "venue": "Great American Music Hall",
-                    "link": link
-                })
-            else:
-                print("⚠️ Skipping incomplete event block")
+def load_page(page):
+    page.goto(URL, timeout=timeout_ms(60000), wait_until="domcontentloaded")
+    page.wait_for_selector(EVENT_SELECTOR, timeout=timeout_ms(30000))
 
-        print(events)
+def render_events():
+    """Load the page in Chromium and extract from the rendered DOM"""
+    # Playwright loads only when the structured fast path found nothing
+    from playwright.sync_api import sync_playwright
+    with sync_playwright() as p:
+        started = time.perf_counter()
+        browser = p.chromium.launch(headless=True)
+        page = browser.new_page()
+        stats = setup_page(page, "gamh")
+        log("⏳ Loading GAMH page...")
+        with METRICS.phase("gamh", "render"), until_deadline("gamh"):
+            # A timed-out load is retried once; an open breaker fails fast instead.
+            # Past the deadline, whatever has rendered so far is extracted
+            POLICY.call("gamh", URL, lambda: load_page(page), retries=1)
+        stats.loaded()
+        log(stats.summary())
+        METRICS.count("gamh", "bytes", stats.bytes)
+
+        rows = []
+        with METRICS.phase("gamh", "parse"), until_deadline("gamh"):
+            rows = page.evaluate(EXTRACT_JS)
+        log(f"✅ Found {len(rows)} events")
 
-        try:
-            response = requests.post("http://localhost:3001/api/events", json=events)
-            print(f"POST status: {response.status_code}")
-            print(f"Response: {response.text}")
-        except requests.exceptions.ConnectionError:
-            print("❌ Could not connect to backend — skipping POST.")
+        with METRICS.phase("gamh", "normalize"):
+            events = build_events(rows)
 
+        TIERS.record("gamh", "browser", (time.perf_counter() - started) * 1000, stats.bytes, browser_rss_mb())
         browser.close()
+    return events
+
+def scrape_gamh_events():
+    events = fetch_structured("gamh", URL, WIDGET, build_events)
+    if events is None:
+        events = render_events()
+
+    print_events(events)
+    # requests, for the POST, loads only when a scrape actually runs
+    from event_submitter import submit_events
+    submit_events(events, venue="gamh")
 
 if __name__ == "__main__":
-    scrape_gamh_events()
+    with profiled("gamh"), deadline(budget_from_argv()):
+        scrape_gamh_events()
+    METRICS.emit()
@@ -1,64 +1,129 @@
-from playwright.sync_api import sync_playwright
-from scraper_utils import normalize_date, normalize_time, insert_unique_events
+from time import perf_counter
 
-def scrape_independent_events():
+from scraper_utils import normalize_date, normalize_time, insert_unique_events, log, emit_event, print_events
+from page_setup import setup_page
+from browser_profiles import context_options, overlay_rules, overlay_script, save_storage_state
+from event_model import Event
+from fetch_policy import POLICY
+from scrape_metrics import METRICS, profiled
+from deadline import budget_from_argv, deadline, out_of_time, timeout_ms, until_deadline
+from structured_data import TIERS, browser_rss_mb, fetch_structured
+
+URL = "https://www.theindependentsf.com/"
+EVENT_SELECTOR = "div.tw-event-item"
+POPUP_SELECTOR = "div#om-mnuwxyw8zcuetb2b-holder .om-close"
+# The TicketWeb list is in the served HTML, so structured_data can usually read it without a browser
+WIDGET = "ticketweb"
+# Hidden before page scripts run (browser_profiles), so the popup normally never needs closing
+OVERLAYS = {"hide": ["div#om-mnuwxyw8zcuetb2b-holder"]}
+
+# One in-page pass returns every field of every block, instead of a browser round trip per field
+EXTRACT_JS = """
+() => Array.from(document.querySelectorAll("div.tw-event-item"), block => {
+    const text = sel => { const el = block.querySelector(sel); return el ? el.innerText.trim() : null; };
+    const artist = block.querySelector("div.tw-name > a");
+    return {
+        artist: artist ? artist.innerText.trim() : null,
+        link: artist ? artist.getAttribute("href") : null,
+        date: text("span.tw-event-date"),
+        time: text("span.tw-event-time-complete")
+    };
+})
+"""
+
+def build_events(rows):
+    """Turn EXTRACT_JS rows into event dicts"""
+    METRICS.count("independent", "blocks", len(rows))
+    events = []
+    for row in rows:
+        if out_of_time("independent"):
+            break
+        artist = row["artist"]
+        link = row["link"]
+
+        if link and not link.startswith("http"):
+            link = "https://www.theindependentsf.com" + link
+
+        date = normalize_date(row["date"])
+        time = normalize_time(row["time"])
+
+        if artist and date:
+            event = Event(
+                title=artist,
+                date=date,
+                time=time,
+                venue="The Independent",
+                link=link
+            ).to_dict()
+            events.append(event)
+            emit_event(event)
+        else:
+            METRICS.skip("independent", "no_date" if artist else "no_artist")
+            log("⚠️ Skipping event due to missing artist or date.")
+    METRICS.count("independent", "kept", len(events))
+    return events
+
+def load_page(page):
+    """Navigate, dismiss the signup popup and wait for the event list"""
+    page.goto(URL, timeout=timeout_ms(60000), wait_until="domcontentloaded")
+
+    try:
+        popup = page.query_selector(POPUP_SELECTOR)
+        if popup and popup.is_visible():
+            popup.click()
+            log("✅ Closed popup.")
+        else:
+            log("ℹ️ No popup showing (suppressed or already closed).")
+    except:
+        log("⚠️ Popup close failed (non-blocking).")
+
+    log("⏳ Waiting for content to load...")
+    page.wait_for_selector(EVENT_SELECTOR, timeout=timeout_ms(30000))
+
+def render_events():
+    """Load the page in Chromium and extract from the rendered DOM"""
+    # Playwright loads only when the structured fast path found nothing
+    from playwright.sync_api import sync_playwright
     with sync_playwright() as p:
+        started = perf_counter()
         browser = p.chromium.launch(headless=True)
-        page = browser.new_page()
-        print("⏳ Loading page...")
-        page.goto("https://www.theindependentsf.com/", timeout=60000)
-
-        try:
-            popup = page.query_selector("div#om-mnuwxyw8zcuetb2b-holder .om-close")
-            if popup:
-                popup.click()
-                print("✅ Closed popup.")
-            else:
-                print("ℹ️ No popup found or already closed.")
-        except:
-            print("⚠️ Popup close failed (non-blocking).")
-
-        print("⏳ Waiting for content to load...")
-        page.wait_for_selector("div.tw-event-item", timeout=30000)
-        event_blocks = page.query_selector_all("div.tw-event-item")
-        print(f"✅ Found {len(event_blocks)} events")
-
-        events = []
-
-        for block in event_blocks:
-            artist_el = block.query_selector("div.tw-name > a")  # 🛠 Corrected
-            date_el = block.query_selector("span.tw-event-date")
-            time_el = block.query_selector("span.tw-event-time-complete")
-            link_el = artist_el
-
-            artist = artist_el.inner_text().strip() if artist_el else None
-            short_date = date_el.inner_text().strip() if date_el else None
-            raw_time = time_el.inner_text().strip() if time_el else None
-            link = link_el.get_attribute("href") if link_el else None
-
-            if link and not link.startswith("http"):
-                link = "https://www.theindependentsf.com" + link
-
-            date = normalize_date(short_date)
-            time = normalize_time(raw_time)
-
-            if artist and date:
-                events.append({
-                    "artist": artist,
-                    "date": date,
-                    "time": time,
-                    "venue": "The Independent",
-                    "link": link
-                })
-            else:
-                print("⚠️ Skipping event due to missing artist or date.")
-
-        print(events)
-
-        result = insert_unique_events(events) or {"inserted": 0, "skipped": 0}
-        print(f"\nDone. Inserted: {result['inserted']}, Skipped (duplicates): {result['skipped']}")
+        # Cookies and localStorage from the last good run, so consent and popup state carry over
+        context = browser.new_context(**context_options("independent"))
+        context.add_init_script(script=overlay_script(overlay_rules(OVERLAYS)))
+        page = context.new_page()
+        stats = setup_page(page, "independent")
+        log("⏳ Loading page...")
+        with METRICS.phase("independent", "render"), until_deadline("independent"):
+            # A timed-out load is retried once; an open breaker fails fast instead.
+            # Past the deadline, whatever has rendered so far is extracted
+            POLICY.call("independent", URL, lambda: load_page(page), retries=1)
+        stats.loaded()
+        log(stats.summary())
+        METRICS.count("independent", "bytes", stats.bytes)
+        rows = []
+        with METRICS.phase("independent", "parse"), until_deadline("independent"):
+            rows = page.evaluate(EXTRACT_JS)
+        log(f"✅ Found {len(rows)} events")
+
+        with METRICS.phase("independent", "normalize"):
+            events = build_events(rows)
 
+        TIERS.record("independent", "browser", (perf_counter() - started) * 1000, stats.bytes, browser_rss_mb())
+        save_storage_state("independent", context.storage_state())
         browser.close()
+    return events
+
+def scrape_independent_events():
+    events = fetch_structured("independent", URL, WIDGET, build_events)
+    if events is None:
+        events = render_events()
+
+    print_events(events)
+
+    result = insert_unique_events(events, venue="independent")
+    log(f"\nDone. Inserted: {result['inserted']}, Skipped (duplicates): {result['skipped']}")
 
 if __name__ == "__main__":
-    scrape_independent_events()
+    with profiled("independent"), deadline(budget_from_argv()):
+        scrape_independent_events()
+    METRICS.emit()
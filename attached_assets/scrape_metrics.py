@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Per-venue phase timings and counters for scraper runs
+Phases (dns, fetch, render, parse, normalize, post, db_write) are exclusive: a phase entered
+inside another pauses the outer one, so a venue's phase times add up to its wall time.
+The phase stack is a context variable, so concurrent asyncio tasks and worker threads
+each time their own work. Work run under `METRICS.scope(key)` is recorded apart from the rest
+of the process, so two concurrent requests for the same venue each get their own numbers from
+take().
+
+Counters cover bytes, DOM blocks scanned, events kept and events skipped by reason, plus fetch
+retries, hedged requests and circuit-breaker states (recorded by fetch_policy), the extractor
+tier that served the venue (structured_data) and why its events are partial, if they are
+(deadline).
+
+Set SCRAPER_PROFILE=<dir> to also dump a cProfile .prof file per profiled run.
+"""
+
+import contextvars
+import json
+import os
+import socket
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+
+class ScrapeMetrics:
+    """Thread-safe metrics for one run; each venue gets its own record"""
+
+    def __init__(self):
+        self.started = time.time()
+        self._venues: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self._stack = contextvars.ContextVar("scrape_metrics_stack", default=())
+        self._scope = contextvars.ContextVar("scrape_metrics_scope", default=None)
+        self._resolved = set()
+
+    @contextmanager
+    def scope(self, key):
+        """Record the block's metrics under `key` (e.g. a request id), apart from other work on its venues"""
+        token = self._scope.set(key)
+        try:
+            yield
+        finally:
+            self._scope.reset(token)
+
+    def _key(self, venue: str):
+        scope = self._scope.get()
+        return venue if scope is None else (scope, venue)
+
+    def _venue(self, venue: str) -> Dict:
+        venue = self._key(venue)
+        if venue not in self._venues:
+            self._venues[venue] = {"phases": {}, "bytes": 0, "blocks": 0, "kept": 0, "skipped": {},
+                                   "retries": 0, "hedged": 0, "breakers": {}, "tier": None,
+                                   "partial": None}
+        return self._venues[venue]
+
+    def _add_time(self, venue: str, name: str, seconds: float):
+        with self._lock:
+            phases = self._venue(venue)["phases"]
+            phases[name] = phases.get(name, 0.0) + seconds
+
+    @contextmanager
+    def phase(self, venue: str, name: str):
+        """Time a block of work as `name`; the enclosing phase in this task/thread is paused meanwhile"""
+        stack = self._stack.get()
+        now = time.perf_counter()
+        if stack:
+            outer = stack[-1]
+            self._add_time(outer[0], outer[1], now - outer[2])
+        entry = [venue, name, now]
+        token = self._stack.set(stack + (entry,))
+        try:
+            yield
+        finally:
+            now = time.perf_counter()
+            self._stack.reset(token)
+            self._add_time(venue, name, now - entry[2])
+            if stack:
+                stack[-1][2] = now
+
+    def count(self, venue: str, name: str, n: int = 1):
+        """Add to a counter: bytes, blocks, kept, retries or hedged"""
+        with self._lock:
+            self._venue(venue)[name] += n
+
+    def skip(self, venue: str, reason: str, n: int = 1):
+        with self._lock:
+            skipped = self._venue(venue)["skipped"]
+            skipped[reason] = skipped.get(reason, 0) + n
+
+    def breaker(self, venue: str, host: str, state: str):
+        """Latest circuit-breaker state seen for one of the venue's hosts"""
+        with self._lock:
+            self._venue(venue)["breakers"][host] = state
+
+    def tier(self, venue: str, tier: str):
+        """Which extractor tier served the venue: jsonld, widget or browser (see structured_data)"""
+        with self._lock:
+            self._venue(venue)["tier"] = tier
+
+    def partial(self, venue: str, reason: str):
+        """The venue's events are incomplete, e.g. its time budget ran out (see deadline)"""
+        with self._lock:
+            self._venue(venue)["partial"] = reason
+
+    def resolve(self, venue: str, url: str):
+        """Time the DNS lookup of url's host, once per host per process"""
+        host = urlparse(url).hostname
+        if not host or host in self._resolved:
+            return
+        self._resolved.add(host)
+        with self.phase(venue, "dns"):
+            try:
+                socket.getaddrinfo(host, 443)
+            except OSError:
+                pass
+
+    @staticmethod
+    def _in_ms(stats: Dict) -> Dict:
+        stats = json.loads(json.dumps(stats))
+        stats["phases"] = {name: round(seconds * 1000, 2) for name, seconds in stats["phases"].items()}
+        return stats
+
+    def take(self, venue: str) -> Optional[Dict]:
+        """Remove and return one venue's record in the current scope; the worker calls it after each request"""
+        with self._lock:
+            stats = self._venues.pop(self._key(venue), None)
+        return self._in_ms(stats) if stats is not None else None
+
+    def record(self) -> Dict:
+        """The whole run as one JSON-serializable dict, phase times in ms"""
+        with self._lock:
+            venues = {venue if isinstance(venue, str) else f"{venue[1]}#{venue[0]}": self._in_ms(stats)
+                      for venue, stats in self._venues.items()}
+        return {
+            "type": "scrape_metrics",
+            "started": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started)),
+            "elapsed_ms": round((time.time() - self.started) * 1000),
+            "venues": venues,
+        }
+
+    def emit(self, out=None):
+        """Write the run record as one JSON line (stderr by default, so stdout stays event-only)"""
+        out = out or sys.stderr
+        out.write(json.dumps(self.record(), ensure_ascii=False) + "\n")
+        out.flush()
+
+    def reset(self):
+        with self._lock:
+            self._venues.clear()
+            self.started = time.time()
+
+
+# Shared by every scraper module in the process
+METRICS = ScrapeMetrics()
+
+
+@contextmanager
+def profiled(label: str):
+    """cProfile the block into $SCRAPER_PROFILE/<label>-<time>.prof when SCRAPER_PROFILE is set"""
+    profile_dir = os.environ.get("SCRAPER_PROFILE")
+    if not profile_dir:
+        yield
+        return
+    import cProfile
+    os.makedirs(profile_dir, exist_ok=True)
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        path = os.path.join(profile_dir, f"{label}-{time.strftime('%Y%m%d-%H%M%S')}.prof")
+        profiler.dump_stats(path)
+        print(f"cProfile written to {path} (python -m pstats {path})", file=sys.stderr)
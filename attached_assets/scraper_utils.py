@@ -1,27 +1,39 @@
-from datetime import datetime
 import json
+import os
+import sys
+
+import date_engine
+from deadline import cut_short
+from scrape_metrics import METRICS
+
+def ndjson_mode():
+    """Machine output mode: `--ndjson` on the command line or SCRAPER_OUTPUT=ndjson"""
+    return "--ndjson" in sys.argv[1:] or os.environ.get("SCRAPER_OUTPUT") == "ndjson"
+
+def log(*args, **kwargs):
+    """Progress/diagnostic print - goes to stderr in NDJSON mode so stdout stays machine-readable"""
+    print(*args, file=sys.stderr if ndjson_mode() else sys.stdout, **kwargs)
+
+def emit_event(event):
+    """Write one compact JSON event line as soon as it is parsed (NDJSON mode only)"""
+    if ndjson_mode():
+        sys.stdout.write(json.dumps(event, ensure_ascii=False, separators=(",", ":")) + "\n")
+        sys.stdout.flush()
+
+def print_events(events):
+    """End-of-run dump for the default mode; in NDJSON mode every event was already emitted
+
+    When the time budget cut the run short every event carries "partial": true (NDJSON readers
+    find the same in the venue's scrape_metrics line on stderr).
+    """
+    if not ndjson_mode():
+        if cut_short():
+            events = [dict(event, partial=True) for event in events]
+        print(json.dumps(events, indent=2))
 
 def normalize_date(date_str):
     """Normalize date string to YYYY-MM-DD format"""
-    if not date_str:
-        return None
-    
-    try:
-        # Handle various date formats
-        if "/" in date_str:
-            # Handle MM/DD or M/D format
-            parts = date_str.split("/")
-            if len(parts) == 2:
-                month, day = parts
-                year = datetime.now().year
-                return f"{year}-{int(month):02d}-{int(day):02d}"
-        
-        # Handle other formats by parsing with datetime
-        parsed = datetime.strptime(date_str.strip(), "%a %b %d")
-        parsed = parsed.replace(year=2025)
-        return parsed.strftime("%Y-%m-%d")
-    except:
-        return None
+    return date_engine.normalize_date(date_str)
 
 def normalize_time(time_str):
     """Extract and normalize time information"""
@@ -29,7 +41,44 @@ def normalize_time(time_str):
         return None
     return time_str.strip()
 
-def insert_unique_events(events):
-    """Mock function for inserting events - in real implementation would connect to database"""
-    print(f"Mock: Would insert {len(events)} events into database")
-    return {"inserted": len(events), "skipped": 0}
\ No newline at end of file
+def _write_result(unwritten=0):
+    """A result with nothing written, shaped like EventWriter.write()'s"""
+    from event_writer import SKIP_REASONS
+    skipped_by_reason = dict.fromkeys(SKIP_REASONS + ("already_seen",), 0)
+    return {"inserted": 0, "skipped": 0, "skipped_by_reason": skipped_by_reason, "unwritten": unwritten}
+
+def insert_unique_events(events, venue="all"):
+    """Upsert events into Postgres in batches, skipping ones already stored (needs DATABASE_URL)
+
+    Every path returns inserted, skipped, skipped_by_reason (each reason present) and unwritten,
+    the events that never reached the database because it is not configured or the write failed.
+    """
+    if not os.environ.get("DATABASE_URL"):
+        log(f"DATABASE_URL not set - not writing {len(events)} events")
+        return _write_result(unwritten=len(events))
+
+    from event_writer import EventWriter
+    from fingerprint_index import FingerprintIndex
+    # The index is locked while open, so it is held only to filter and to mark, not across the write
+    with FingerprintIndex() as index:
+        # Events written by an earlier run never reach the database
+        fresh = index.unseen(events)
+    known = len(events) - len(fresh)
+    writer = EventWriter()
+    try:
+        with METRICS.phase(venue, "db_write"):
+            result = writer.write(fresh)
+    except Exception as e:
+        log(f"❌ Database write failed: {e}")
+        return _write_result(unwritten=len(events))
+    finally:
+        writer.close()
+    # Only events the database holds; ones skipped for a missing venue row, date or title are retried next run
+    with FingerprintIndex() as index:
+        index.mark_seen(result.pop("stored"))
+
+    result["skipped"] += known
+    result["skipped_by_reason"]["already_seen"] = known
+    result["unwritten"] = 0
+    log(f"Inserted {result['inserted']} events, skipped {result['skipped']} {result['skipped_by_reason']}")
+    return result
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Long-lived scraper worker speaking JSON lines on stdin/stdout
+Keeps imports, the HTTP session and the shared browser warm between requests
+
+Request:  {"id": 1, "venue": "gamh", "source": "browser", "deadline_ms": 30000}
+          source is "browser" (playwright_runner venues) or "simple" (simple_scrapers venues);
+          deadline_ms (optional) is the scrape's time budget, see deadline.py
+Response: {"id": 1, "ok": true, "events": [...], "partial": false, "elapsed_ms": 812, "page_load": {...},
+           "metrics": {...}, "next_crawl": 1750200000.0}
+          {"id": 1, "ok": false, "error": "..."}
+          metrics holds the venue's phase times (ms), bytes, blocks, kept and skipped-by-reason counts;
+          next_crawl is when recrawl_scheduler expects the venue's calendar to be worth scraping again;
+          partial means the deadline cut the scrape short and events holds what was parsed by then
+Send {"op": "shutdown"} (or close stdin) to stop the worker.
+"""
+
+import asyncio
+import itertools
+import json
+import sys
+import time
+from typing import Dict, List
+
+import simple_scrapers
+from playwright_runner import PlaywrightRunner, VENUE_MODULES
+from deadline import deadline
+from recrawl_scheduler import RecrawlScheduler
+from scrape_metrics import METRICS
+
+SIMPLE_VENUES = {
+    "independent": simple_scrapers.scrape_independent,
+    "bottom": simple_scrapers.scrape_bottom_of_hill,
+    "cafe": simple_scrapers.scrape_cafe_du_nord,
+}
+
+
+class ScraperWorker:
+    def __init__(self, out, concurrency: int = 3):
+        self.out = out
+        self.runner = PlaywrightRunner(concurrency)
+        self._write_lock = asyncio.Lock()
+        self.scheduler = RecrawlScheduler()
+        # Scopes each request's metrics; request ids come from the client and may repeat
+        self._requests = itertools.count()
+
+    async def respond(self, payload: Dict):
+        async with self._write_lock:
+            self.out.write(json.dumps(payload) + "\n")
+            self.out.flush()
+
+    async def scrape(self, venue: str, source: str) -> List[Dict]:
+        if source == "simple":
+            if venue not in SIMPLE_VENUES:
+                raise ValueError(f"unknown simple venue: {venue}")
+            return await asyncio.to_thread(SIMPLE_VENUES[venue])
+        if source == "browser":
+            if venue not in VENUE_MODULES:
+                raise ValueError(f"unknown browser venue: {venue}")
+            return await self.runner.scrape(venue)
+        raise ValueError(f"unknown source: {source}")
+
+    async def handle(self, request: Dict):
+        # Concurrent requests for one venue each get their own metrics record
+        with METRICS.scope(next(self._requests)):
+            await self._handle(request)
+
+    async def _handle(self, request: Dict):
+        started = time.perf_counter()
+        try:
+            source = request.get("source", "browser")
+            # Each request runs in its own task, so the deadline applies to this scrape only
+            with deadline((request.get("deadline_ms") or 0) / 1000):
+                events = await self.scrape(request["venue"], source)
+            response = {
+                "id": request.get("id"),
+                "ok": True,
+                "events": events,
+                "partial": False,
+                "elapsed_ms": round((time.perf_counter() - started) * 1000)
+            }
+            if source == "browser":
+                response["page_load"] = self.runner.load_stats.get(request["venue"])
+            # Taken out of the process-wide record so a venue's numbers don't accumulate across requests
+            response["metrics"] = METRICS.take(request["venue"])
+            response["partial"] = bool(response["metrics"] and response["metrics"]["partial"])
+            if response["partial"]:
+                # A cut-short event set would read as a change; keep the schedule as it was
+                response["next_crawl"] = self.scheduler.venue(request["venue"])["next_crawl"]
+            else:
+                response["next_crawl"] = self.scheduler.record(
+                    request["venue"], events, time.perf_counter() - started)["next_crawl"]
+            await self.respond(response)
+        except Exception as e:
+            METRICS.take(request.get("venue"))
+            await self.respond({"id": request.get("id"), "ok": False, "error": f"{type(e).__name__}: {e}"})
+
+    async def serve(self, stdin):
+        """Read requests until EOF or shutdown; requests run concurrently"""
+        tasks = set()
+        try:
+            while True:
+                line = await asyncio.to_thread(stdin.readline)
+                if not line:
+                    break
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    request = json.loads(line)
+                except json.JSONDecodeError as e:
+                    await self.respond({"id": None, "ok": False, "error": f"invalid request: {e}"})
+                    continue
+                if request.get("op") == "shutdown":
+                    break
+                task = asyncio.create_task(self.handle(request))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks)
+        finally:
+            await self.runner.close()
+
+
+def main():
+    # stdout carries the protocol only; scraper prints and diagnostics go to stderr
+    protocol_out = sys.stdout
+    sys.stdout = sys.stderr
+    asyncio.run(ScraperWorker(protocol_out).serve(sys.stdin))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,52 @@
 #!/usr/bin/env python3
-import requests
-import json
-from datetime import datetime
 import re
-from bs4 import BeautifulSoup
+from date_engine import normalize_date
+from event_model import Event
+from fetch_policy import POLICY
+from scraper_utils import log, emit_event, print_events
+from scrape_metrics import METRICS, profiled
+from deadline import deadline, env_budget, out_of_time, timeout
+
+# Compiled once at import instead of on every call
+EVENT_CONTAINER = re.compile(r'event|show|listing', re.I)
+WORD = re.compile(r'\w+')
+SHORT_DATE_TEXT = re.compile(r'\d{1,2}[\/\-]\d{1,2}|\w+ \d{1,2}')
+LONG_DATE = re.compile(r'(\w+\s+\d{1,2},?\s+20\d{2})')
+DAY_MONTH_DAY = re.compile(r'(\w{3})\s+(\d{1,2})\/(\d{1,2})')
+
+# Shared keep-alive session, created on the first fetch; stays warm across calls when run inside scraper_worker.py
+session = None
+
+# requests and bs4 are imported by the first fetch/parse, not at module load, so importing this
+# module (scraper_worker, parse_bench) stays cheap and each CLI run loads only what it uses
+
+def make_soup(content, parser=None):
+    from html_parser import make_soup
+    return make_soup(content, parser)
+
+def _fetch(venue, url, headers):
+    """GET a venue page, recording DNS, fetch time and bytes"""
+    global session
+    if session is None:
+        import requests
+        session = requests.Session()
+    METRICS.resolve(venue, url)
+    with METRICS.phase(venue, "fetch"):
+        try:
+            response = POLICY.get(session, venue, url, headers=headers, timeout=timeout(10))
+        except Exception:
+            # Marks the venue partial when it was the time budget that ran out
+            out_of_time(venue)
+            raise
+    METRICS.count(venue, "bytes", len(response.content))
+    return response
+
+def _normalize_date(venue, date_str):
+    with METRICS.phase(venue, "normalize"):
+        formatted_date = normalize_date(date_str)
+    if not formatted_date:
+        METRICS.skip(venue, "bad_date")
+    return formatted_date
 
 def scrape_independent():
     """Scrape The Independent using requests and BeautifulSoup"""
@@ -12,46 +55,47 @@ def scrape_independent():
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
         
-        response = requests.get('https://www.theindependentsf.com/', headers=headers, timeout=10)
+        response = _fetch("independent", 'https://www.theindependentsf.com/', headers)
         if response.status_code != 200:
             return []
             
-        soup = BeautifulSoup(response.content, 'html.parser')
-        events = []
-        
-        # Look for event containers
-        event_containers = soup.find_all(['div', 'section'], class_=re.compile(r'event|show|listing', re.I))
-        
-        for container in event_containers[:10]:  # Limit to first 10 found
-            title_elem = container.find(['h1', 'h2', 'h3', 'h4', 'a'], text=re.compile(r'\w+'))
-            date_elem = container.find(text=re.compile(r'\d{1,2}[\/\-]\d{1,2}|\w+ \d{1,2}'))
+        with METRICS.phase("independent", "parse"):
+            soup = make_soup(response.content)
+            events = []
+            
+            # Look for event containers
+            event_containers = soup.find_all(['div', 'section'], class_=EVENT_CONTAINER)
+            METRICS.count("independent", "blocks", min(len(event_containers), 10))
             
-            if title_elem and date_elem:
+            for container in event_containers[:10]:  # Limit to first 10 found
+                if out_of_time("independent"):
+                    break
+                title_elem = container.find(['h1', 'h2', 'h3', 'h4', 'a'], text=WORD)
+                date_elem = container.find(text=SHORT_DATE_TEXT)
+                
+                if not (title_elem and date_elem):
+                    METRICS.skip("independent", "no_title" if not title_elem else "no_date")
+                    continue
+                
                 title = title_elem.get_text(strip=True) if hasattr(title_elem, 'get_text') else str(title_elem).strip()
                 date_str = date_elem.strip() if isinstance(date_elem, str) else date_elem.get_text(strip=True)
                 
-                # Basic date parsing
-                try:
-                    if '/' in date_str:
-                        parts = date_str.split('/')
-                        if len(parts) >= 2:
-                            month, day = parts[0], parts[1]
-                            year = datetime.now().year
-                            formatted_date = f"{year}-{int(month):02d}-{int(day):02d}"
-                            
-                            events.append({
-                                "artist": title,
-                                "date": formatted_date,
-                                "venue": "The Independent",
-                                "link": "https://www.theindependentsf.com/"
-                            })
-                except:
-                    continue
+                formatted_date = _normalize_date("independent", date_str)
+                if formatted_date:
+                    event = Event(
+                        title=title,
+                        date=formatted_date,
+                        venue="The Independent",
+                        link="https://www.theindependentsf.com/"
+                    ).to_dict()
+                    events.append(event)
+                    emit_event(event)
         
+        METRICS.count("independent", "kept", len(events))
         return events
         
     except Exception as e:
-        print(f"Error scraping The Independent: {e}")
+        log(f"Error scraping The Independent: {e}")
         return []
 
 def scrape_bottom_of_hill():
@@ -61,44 +105,50 @@ def scrape_bottom_of_hill():
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         }
         
-        response = requests.get('https://www.bottomofthehill.com/calendar.html', headers=headers, timeout=10)
+        response = _fetch("bottom", 'https://www.bottomofthehill.com/calendar.html', headers)
         if response.status_code != 200:
             return []
             
-        soup = BeautifulSoup(response.content, 'html.parser')
-        events = []
-        
-        # Look for table rows or event containers
-        rows = soup.find_all('tr')
-        for row in rows[:20]:  # Limit search
-            cells = row.find_all(['td', 'th'])
-            if len(cells) >= 2:
+        with METRICS.phase("bottom", "parse"):
+            soup = make_soup(response.content)
+            events = []
+            
+            # Look for table rows or event containers
+            rows = soup.find_all('tr')
+            METRICS.count("bottom", "blocks", min(len(rows), 20))
+            for row in rows[:20]:  # Limit search
+                if out_of_time("bottom"):
+                    break
+                cells = row.find_all(['td', 'th'])
+                if len(cells) < 2:
+                    METRICS.skip("bottom", "not_event_row")
+                    continue
                 text_content = ' '.join([cell.get_text(strip=True) for cell in cells])
                 
                 # Look for dates and band names
-                date_match = re.search(r'(\w+\s+\d{1,2},?\s+20\d{2})', text_content)
-                if date_match and len(text_content) > 20:  # Has substantial content
-                    try:
-                        date_str = date_match.group(1).replace(',', '')
-                        parsed_date = datetime.strptime(date_str, "%B %d %Y")
-                        formatted_date = parsed_date.strftime("%Y-%m-%d")
-                        
-                        # Extract artist name (simple heuristic)
-                        artist = text_content.split()[0] if text_content else "Unknown Artist"
-                        
-                        events.append({
-                            "artist": artist,
-                            "date": formatted_date,
-                            "venue": "Bottom of the Hill",
-                            "link": "https://www.bottomofthehill.com/calendar.html"
-                        })
-                    except:
-                        continue
+                date_match = LONG_DATE.search(text_content)
+                if not (date_match and len(text_content) > 20):  # Has substantial content
+                    METRICS.skip("bottom", "no_date")
+                    continue
+                formatted_date = _normalize_date("bottom", date_match.group(1))
+                if formatted_date:
+                    # Extract artist name (simple heuristic)
+                    artist = text_content.split()[0] if text_content else "Unknown Artist"
+                    
+                    event = Event(
+                        title=artist,
+                        date=formatted_date,
+                        venue="Bottom of the Hill",
+                        link="https://www.bottomofthehill.com/calendar.html"
+                    ).to_dict()
+                    events.append(event)
+                    emit_event(event)
         
+        METRICS.count("bottom", "kept", len(events))
         return events
         
     except Exception as e:
-        print(f"Error scraping Bottom of the Hill: {e}")
+        log(f"Error scraping Bottom of the Hill: {e}")
         return []
 
 def scrape_cafe_du_nord():
@@ -108,60 +158,77 @@ def scrape_cafe_du_nord():
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         }
         
-        response = requests.get('https://cafedunord.com/', headers=headers, timeout=10)
+        response = _fetch("cafe", 'https://cafedunord.com/', headers)
         if response.status_code != 200:
             return []
             
-        soup = BeautifulSoup(response.content, 'html.parser')
-        events = []
-        
-        # Look for table rows with event data
-        rows = soup.find_all('tr')
-        for row in rows:
-            cells = row.find_all('td')
-            if len(cells) >= 2:
+        with METRICS.phase("cafe", "parse"):
+            soup = make_soup(response.content)
+            events = []
+            
+            # Look for table rows with event data
+            rows = soup.find_all('tr')
+            METRICS.count("cafe", "blocks", len(rows))
+            for row in rows:
+                if out_of_time("cafe"):
+                    break
+                cells = row.find_all('td')
+                if len(cells) < 2:
+                    METRICS.skip("cafe", "not_event_row")
+                    continue
                 date_cell = cells[0].get_text(strip=True)
                 event_cell = cells[1].get_text(strip=True)
                 
                 # Match date format like "SAT 1/18"
-                date_match = re.match(r'(\w{3})\s+(\d{1,2})\/(\d{1,2})', date_cell)
-                if date_match and event_cell and 'Private Event' not in event_cell:
-                    try:
-                        month, day = date_match.groups()[1], date_match.groups()[2]
-                        year = datetime.now().year
-                        formatted_date = f"{year}-{int(month):02d}-{int(day):02d}"
-                        
-                        events.append({
-                            "artist": event_cell,
-                            "date": formatted_date,
-                            "venue": "Cafe du Nord",
-                            "link": "https://cafedunord.com/"
-                        })
-                    except:
-                        continue
+                date_match = DAY_MONTH_DAY.match(date_cell)
+                if not (date_match and event_cell):
+                    METRICS.skip("cafe", "no_date" if not date_match else "no_title")
+                    continue
+                if 'Private Event' in event_cell:
+                    METRICS.skip("cafe", "private_event")
+                    continue
+                formatted_date = _normalize_date("cafe", date_cell)
+                if formatted_date:
+                    event = Event(
+                        title=event_cell,
+                        date=formatted_date,
+                        venue="Cafe du Nord",
+                        link="https://cafedunord.com/"
+                    ).to_dict()
+                    events.append(event)
+                    emit_event(event)
         
+        METRICS.count("cafe", "kept", len(events))
         return events
         
     except Exception as e:
-        print(f"Error scraping Cafe du Nord: {e}")
+        log(f"Error scraping Cafe du Nord: {e}")
         return []
 
 if __name__ == "__main__":
-    import sys
-    
-    venue = sys.argv[1] if len(sys.argv) > 1 else "all"
+    import argparse
     
-    if venue == "independent":
-        events = scrape_independent()
-    elif venue == "bottom":
-        events = scrape_bottom_of_hill()
-    elif venue == "cafe":
-        events = scrape_cafe_du_nord()
-    else:
-        # Run all scrapers
-        events = []
-        events.extend(scrape_independent())
-        events.extend(scrape_bottom_of_hill())
-        events.extend(scrape_cafe_du_nord())
+    parser = argparse.ArgumentParser(description="Scrape venues with plain HTTP requests")
+    parser.add_argument("venue", nargs="?", default="all", choices=["independent", "bottom", "cafe", "all"])
+    parser.add_argument("--budget", type=float, metavar="SECONDS", help="time budget in seconds (default: SCRAPER_BUDGET)")
+    parser.add_argument("--ndjson", action="store_true", help="stream one JSON event per line")
+    args = parser.parse_args()
+    venue = args.venue
+    budget = args.budget if args.budget is not None else env_budget()
     
-    print(json.dumps(events, indent=2))
\ No newline at end of file
+    with profiled(f"simple_scrapers-{venue}"), deadline(budget):
+        if venue == "independent":
+            events = scrape_independent()
+        elif venue == "bottom":
+            events = scrape_bottom_of_hill()
+        elif venue == "cafe":
+            events = scrape_cafe_du_nord()
+        else:
+            # Run all scrapers
+            events = []
+            events.extend(scrape_independent())
+            events.extend(scrape_bottom_of_hill())
+            events.extend(scrape_cafe_du_nord())
+        
+        print_events(events)
+    METRICS.emit()
\ No newline at end of file
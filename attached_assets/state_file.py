@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+JSON state files shared by several processes
+locked_state() holds an exclusive lock on <path>.lock while the caller edits what is on disk
+right now, then writes it back through a tmp file and os.replace, so the scraper worker and the
+crawl coordinator's workers merge their updates instead of the last writer wiping the others'.
+Readers need no lock: the file is only ever replaced whole.
+"""
+
+import json
+import os
+from contextlib import contextmanager
+from typing import Dict
+
+try:
+    import fcntl
+except ImportError:
+    # No advisory locks (Windows); writes stay atomic, concurrent updates can still be lost
+    fcntl = None
+
+
+def load_state(path: str) -> Dict:
+    """The file's contents, or {} when it is missing or unreadable"""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+@contextmanager
+def locked_state(path: str):
+    """Yield the current state for editing under the file lock; saved when the block exits cleanly"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path + ".lock", "a") as lock:
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            state = load_state(path)
+            yield state
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(state, f, indent=2)
+            os.replace(tmp_path, path)
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_UN)
@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+Structured-data fast path for the browser venues
+Before launching Chromium, fetch the venue page over plain HTTP and look for events in it:
+  1. jsonld - schema.org Event objects (MusicEvent etc.) in <script type="application/ld+json">
+  2. widget - a ticketing widget's server-rendered markup (SeeTickets, TicketWeb), read with the
+     same fields the browser's EXTRACT_JS returns and turned into events by the venue's build_events
+Only when neither yields events does the caller fall back to the browser tier; a page without
+either is then re-checked once a day rather than fetched twice on every scrape.
+
+Which tier served each venue, and its latency and transfer, are kept in .scrape_state/tiers.json
+next to the venue's last browser run (latency, transfer and Chromium process-tree RSS), so the
+savings of skipping the browser can be reported; the tier also lands in the venue's scrape_metrics.
+
+    python structured_data.py [venue ...]    try the fast path and report tiers and savings
+    python structured_data.py --report       report from the saved state only
+"""
+
+import argparse
+import json
+import os
+import re
+import threading
+import time
+from datetime import date, datetime
+from typing import Callable, Dict, List, Optional
+
+from deadline import expired, out_of_time, timeout
+from event_model import Event
+from fetch_policy import POLICY
+from scrape_metrics import METRICS
+from scraper_utils import emit_event, log
+from state_file import load_state, locked_state
+
+# A venue whose page had no structured events is re-checked this often, not on every scrape
+RETRY_MISSES_AFTER = 24 * 3600
+
+JSON_LD = re.compile(r'<script[^>]*type=["\']application/ld\+json["\'][^>]*>(.*?)</script>', re.I | re.S)
+
+# Widget markup as the widget's own script or WordPress plugin renders it; every field is
+# (selector inside the block, attribute or None for the element's text), mirroring EXTRACT_JS
+WIDGETS = {
+    "seetickets": {
+        "block": "div.seetickets-list-event-container",
+        "fields": {
+            "artist": ("p.event-title a", None),
+            "link": ("p.event-title a", "href"),
+            "date": ("p.event-date", None),
+            "time": ("p.doortime-showtime", None),
+        },
+    },
+    "ticketweb": {
+        "block": "div.tw-event-item",
+        "fields": {
+            "artist": ("div.tw-name > a", None),
+            "link": ("div.tw-name > a", "href"),
+            "date": ("span.tw-event-date", None),
+            "time": ("span.tw-event-time-complete", None),
+        },
+    },
+}
+
+# Venue names for JSON-LD events whose location has none; same names the scrapers write
+VENUE_NAMES = {
+    "gamh": "Great American Music Hall",
+    "chapel": "The Chapel",
+    "bottom": "Bottom of the Hill",
+    "independent": "The Independent",
+    "cafe": "Café du Nord",
+}
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+}
+
+# Created on the first fetch so importing this module (every browser scraper does) stays cheap
+session = None
+
+
+def _is_event(node: Dict) -> bool:
+    types = node.get("@type")
+    types = types if isinstance(types, list) else [types]
+    return any(isinstance(t, str) and t.endswith("Event") for t in types)
+
+
+def _walk(node):
+    """Every dict in a JSON-LD document, including @graph members and nested lists"""
+    if isinstance(node, list):
+        for item in node:
+            yield from _walk(item)
+    elif isinstance(node, dict):
+        yield node
+        for key in ("@graph", "itemListElement", "item", "subEvent"):
+            if key in node:
+                yield from _walk(node[key])
+
+
+def _names(value) -> List[str]:
+    values = value if isinstance(value, list) else [value]
+    names = []
+    for item in values:
+        name = item.get("name") if isinstance(item, dict) else item
+        if isinstance(name, str) and name.strip():
+            names.append(name.strip())
+    return names
+
+
+def _start(value) -> Optional[datetime]:
+    if not isinstance(value, str):
+        return None
+    try:
+        return datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+    except ValueError:
+        return None
+
+
+def jsonld_events(html: str, venue: str) -> List[Dict]:
+    """schema.org Events from the page's JSON-LD blocks, as event dicts; past events are dropped"""
+    events = []
+    today = date.today()
+    for match in JSON_LD.finditer(html):
+        try:
+            document = json.loads(match.group(1), strict=False)
+        except ValueError:
+            METRICS.skip(venue, "bad_jsonld")
+            continue
+        for node in _walk(document):
+            if out_of_time(venue):
+                break
+            if not _is_event(node):
+                continue
+            METRICS.count(venue, "blocks")
+            title = (_names(node.get("name")) or [None])[0]
+            start = _start(node.get("startDate"))
+            if not (title and start):
+                METRICS.skip(venue, "no_date" if title else "no_artist")
+                continue
+            if start.date() < today:
+                METRICS.skip(venue, "past")
+                continue
+            offers = node.get("offers")
+            offer = offers[0] if isinstance(offers, list) and offers else offers
+            link = node.get("url") or (offer.get("url") if isinstance(offer, dict) else None)
+            has_time = "T" in node["startDate"]
+            event = Event(
+                title=title,
+                artists=_names(node.get("performer")) or None,
+                date=start.date().isoformat(),
+                time=start.strftime("%I:%M %p").lstrip("0") if has_time else None,
+                venue=(_names(node.get("location")) or [VENUE_NAMES.get(venue, venue)])[0],
+                link=link if isinstance(link, str) else None,
+            ).to_dict()
+            events.append(event)
+            emit_event(event)
+    METRICS.count(venue, "kept", len(events))
+    return events
+
+
+def widget_rows(html: str, widget: str) -> List[Dict]:
+    """EXTRACT_JS-shaped rows read from a widget's markup in the fetched HTML"""
+    from html_parser import make_soup
+    spec = WIDGETS[widget]
+    rows = []
+    for block in make_soup(html).select(spec["block"]):
+        row = {}
+        for field, (selector, attr) in spec["fields"].items():
+            el = block.select_one(selector)
+            if el is None:
+                row[field] = None
+            elif attr:
+                row[field] = el.get(attr)
+            else:
+                row[field] = el.get_text(" ", strip=True)
+        rows.append(row)
+    return rows
+
+
+class TierStats:
+    """Last fast-path and browser run per venue, persisted as JSON"""
+
+    def __init__(self, path: str = ".scrape_state/tiers.json"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._state = load_state(path)
+
+    def record(self, venue: str, tier: str, ms: float, size: int, rss_mb: Optional[float] = None):
+        """Log which tier served a venue; the browser tier also keeps the Chromium RSS it cost"""
+        METRICS.tier(venue, tier)
+        run = {"ms": round(ms), "bytes": size, "at": time.time()}
+        if rss_mb is not None:
+            run["rss_mb"] = round(rss_mb, 1)
+        with self._lock, locked_state(self.path) as saved:
+            # Other processes (crawl_coordinator workers) may have recorded venues since this one loaded the file
+            self._state = saved
+            state = saved.setdefault(venue, {})
+            state["tier"] = tier
+            state["browser" if tier == "browser" else "structured"] = run
+            if tier != "browser":
+                state.pop("missed", None)
+
+    def missed(self, venue: str):
+        """The page had no structured events, so the fast path is skipped for RETRY_MISSES_AFTER"""
+        with self._lock, locked_state(self.path) as saved:
+            self._state = saved
+            saved.setdefault(venue, {"tier": "browser"})["missed"] = time.time()
+
+    def worth_trying(self, venue: str) -> bool:
+        with self._lock:
+            missed = self._state.get(venue, {}).get("missed")
+        return not missed or time.time() - missed >= RETRY_MISSES_AFTER
+
+    def report(self) -> Dict[str, Dict]:
+        """Per venue: tier last used, and the latency, transfer and memory the fast path saves over the browser"""
+        with self._lock:
+            state = json.loads(json.dumps(self._state))
+        report = {}
+        for venue, runs in sorted(state.items()):
+            fast, browser = runs.get("structured"), runs.get("browser")
+            row = {"tier": runs["tier"], "structured": fast, "browser": browser}
+            if fast and browser:
+                row["saved_ms"] = browser["ms"] - fast["ms"]
+                row["saved_bytes"] = browser["bytes"] - fast["bytes"]
+                row["saved_rss_mb"] = browser.get("rss_mb")
+            report[venue] = row
+        return report
+
+
+TIERS = TierStats()
+
+
+def browser_rss_mb() -> Optional[float]:
+    """Resident memory of this process's child processes (the Chromium tree), from /proc; None elsewhere"""
+    try:
+        pids = [int(pid) for pid in os.listdir("/proc") if pid.isdigit()]
+    except OSError:
+        return None
+    parents, rss = {}, {}
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/stat") as f:
+                # The command name may contain spaces; fields after it are fixed
+                fields = f.read().rsplit(")", 1)[1].split()
+        except (OSError, IndexError):
+            continue
+        parents[pid] = int(fields[1])
+        rss[pid] = int(fields[21]) * os.sysconf("SC_PAGE_SIZE")
+    me = os.getpid()
+    total = 0
+    for pid in parents:
+        ancestor = parents[pid]
+        while ancestor and ancestor != me:
+            ancestor = parents.get(ancestor, 0)
+        if ancestor == me:
+            total += rss[pid]
+    return total / (1 << 20)
+
+
+def fetch_structured(venue: str, url: str, widget: Optional[str] = None,
+                     build_events: Optional[Callable[[List[Dict]], List[Dict]]] = None) -> Optional[List[Dict]]:
+    """Events from the page's JSON-LD or widget markup over plain HTTP, or None to fall back to the browser"""
+    global session
+    if not TIERS.worth_trying(venue) or expired():
+        return None
+    if session is None:
+        import requests
+        session = requests.Session()
+    started = time.perf_counter()
+    try:
+        METRICS.resolve(venue, url)
+        with METRICS.phase(venue, "fetch"):
+            response = POLICY.get(session, venue, url, headers=HEADERS, timeout=timeout(10))
+    except Exception as e:
+        log(f"⚠️ {venue}: structured fetch failed ({type(e).__name__}), using the browser")
+        return None
+    if response.status_code != 200:
+        TIERS.missed(venue)
+        return None
+    METRICS.count(venue, "bytes", len(response.content))
+    html = response.text
+
+    with METRICS.phase(venue, "parse"):
+        events = jsonld_events(html, venue)
+    tier = "jsonld"
+    if not events and widget and build_events:
+        with METRICS.phase(venue, "parse"):
+            rows = widget_rows(html, widget)
+        if rows:
+            with METRICS.phase(venue, "normalize"):
+                events = build_events(rows)
+            tier = "widget"
+    if not events:
+        TIERS.missed(venue)
+        return None
+    TIERS.record(venue, tier, (time.perf_counter() - started) * 1000, len(response.content))
+    log(f"⚡ {venue}: {len(events)} events from {tier} without a browser")
+    return events
+
+
+def show_report(report: Dict[str, Dict]):
+    if not report:
+        print("No tier runs recorded")
+    for venue, row in report.items():
+        line = f"{venue:12} {row['tier']:8}"
+        if "saved_ms" in row:
+            rss = f", {row['saved_rss_mb']:.0f} MB Chromium RSS" if row["saved_rss_mb"] is not None else ""
+            line += (f" {row['structured']['ms']:6} ms vs {row['browser']['ms']:6} ms in the browser: saves "
+                     f"{row['saved_ms']} ms, {row['saved_bytes'] / 1024:.0f} KiB{rss}")
+        print(line)
+
+
+if __name__ == "__main__":
+    from playwright_runner import VENUE_MODULES
+
+    parser = argparse.ArgumentParser(description="Try the structured-data fast path and report tiers per venue")
+    parser.add_argument("venues", nargs="*", help=f"venues to try: {', '.join(VENUE_MODULES)} (default: all)")
+    parser.add_argument("--report", action="store_true", help="only report the saved tier state")
+    args = parser.parse_args()
+
+    if not args.report:
+        for venue in args.venues or VENUE_MODULES:
+            module = VENUE_MODULES[venue]
+            events = fetch_structured(venue, module.URL, getattr(module, "WIDGET", None), module.build_events)
+            print(f"{venue:12} {'browser needed' if events is None else f'{len(events)} events'}")
+    show_report(TIERS.report())
@@ -1,8 +1,12 @@
-import { exec } from 'child_process';
-import { promisify } from 'util';
+import { spawn, ChildProcessWithoutNullStreams } from 'child_process';
+import { createInterface } from 'readline';
 import { scraperMonitor } from './scraper-monitor';
 
-const execAsync = promisify(exec);
+// Interpreter with the scrapers' dependencies; set PYTHON_BIN when it isn't the python3 on PATH
+const PYTHON_BIN = process.env.PYTHON_BIN || 'python3';
+const REQUEST_TIMEOUT_MS = 35000;
+// Scrape time budget sent to the worker; the rest of the request timeout is for flushing results back
+const SCRAPE_DEADLINE_MS = 30000;
 
 interface ScrapedEvent {
   artist: string;
@@ -12,51 +16,144 @@ interface ScrapedEvent {
   link?: string;
 }
 
-export class PythonScrapers {
-  private async runPythonScript(scriptPath: string, venueName: string): Promise<ScrapedEvent[]> {
-    try {
-      console.log(`Running Python scraper for ${venueName}...`);
-      
-      // Check if python3 is available
+// Per-venue record from attached_assets/scrape_metrics.py; phase times are in ms
+interface ScrapeMetrics {
+  phases: Record<string, number>;
+  bytes: number;
+  blocks: number;
+  kept: number;
+  skipped: Record<string, number>;
+  retries?: number;
+  hedged?: number;
+  breakers?: Record<string, string>;
+  // Extractor that served the venue: jsonld, widget (structured data over HTTP) or browser
+  tier?: string | null;
+  partial?: string | null;
+}
+
+interface WorkerResponse {
+  id: number;
+  ok: boolean;
+  events?: ScrapedEvent[];
+  error?: string;
+  elapsed_ms?: number;
+  // The deadline cut the scrape short; events holds what was parsed by then
+  partial?: boolean;
+  metrics?: ScrapeMetrics | null;
+  next_crawl?: number;
+}
+
+function formatMetrics(metrics: ScrapeMetrics): string {
+  const phases = Object.entries(metrics.phases).map(([name, ms]) => `${name} ${Math.round(ms)}ms`).join(', ');
+  const skipped = Object.entries(metrics.skipped).map(([reason, count]) => `${reason} ${count}`).join(', ');
+  const breakers = Object.entries(metrics.breakers ?? {})
+    .filter(([, state]) => state !== 'closed')
+    .map(([host, state]) => `${host} ${state}`).join(', ');
+  const tier = metrics.tier ? `[${metrics.tier}] ` : '';
+  return `${tier}${phases}; ${metrics.bytes} bytes, ${metrics.blocks} blocks, ${metrics.kept} kept` +
+    (skipped ? `, skipped: ${skipped}` : '') +
+    (metrics.retries ? `, ${metrics.retries} retries` : '') +
+    (metrics.hedged ? `, ${metrics.hedged} hedged` : '') +
+    (breakers ? `, breakers: ${breakers}` : '');
+}
+
+interface PendingRequest {
+  resolve: (response: WorkerResponse) => void;
+  reject: (error: Error) => void;
+  timer: NodeJS.Timeout;
+}
+
+// Resident attached_assets/scraper_worker.py process; imports, HTTP session and browser stay warm between calls
+class PythonWorker {
+  private proc: ChildProcessWithoutNullStreams | null = null;
+  private nextId = 1;
+  private pending = new Map<number, PendingRequest>();
+
+  private start(): ChildProcessWithoutNullStreams {
+    if (this.proc) return this.proc;
+
+    const proc = spawn(PYTHON_BIN, ['scraper_worker.py'], { cwd: 'attached_assets' });
+    this.proc = proc;
+
+    createInterface({ input: proc.stdout }).on('line', (line) => {
+      let response: WorkerResponse;
       try {
-        await execAsync('which python3');
+        response = JSON.parse(line);
       } catch {
-        console.log(`Python3 not available, falling back to Node.js scraper for ${venueName}`);
-        return [];
+        console.warn('Python worker sent a non-JSON line:', line);
+        return;
       }
-      
-      const { stdout, stderr } = await execAsync(`cd attached_assets && timeout 30s /home/runner/workspace/.pythonlibs/bin/python3 ${scriptPath}`, {
-        timeout: 35000
-      });
-      
-      if (stderr && !stderr.includes('warning')) {
-        console.warn(`Python scraper stderr for ${venueName}:`, stderr);
+      const request = this.pending.get(response.id);
+      if (!request) return;
+      clearTimeout(request.timer);
+      this.pending.delete(response.id);
+      request.resolve(response);
+    });
+
+    proc.stderr.on('data', (chunk) => {
+      const text = chunk.toString().trim();
+      if (text) console.log(`[python-worker] ${text}`);
+    });
+
+    // A process already killed or replaced has nothing left to fail
+    const fail = (error: Error) => {
+      if (this.proc === proc) this.stop(error);
+    };
+    proc.on('error', fail);
+    proc.stdin.on('error', fail);
+    proc.on('exit', (code) => fail(new Error(`Python worker exited with code ${code}`)));
+
+    return proc;
+  }
+
+  // Kill the current process and reject everything queued on it; the next request starts a fresh one
+  private stop(error: Error) {
+    const proc = this.proc;
+    this.proc = null;
+    this.pending.forEach((request) => {
+      clearTimeout(request.timer);
+      request.reject(error);
+    });
+    this.pending.clear();
+    if (proc && proc.exitCode === null) proc.kill('SIGKILL');
+  }
+
+  request(venue: string, source: 'browser' | 'simple'): Promise<WorkerResponse> {
+    return new Promise((resolve, reject) => {
+      const proc = this.start();
+      const id = this.nextId++;
+      // A worker that misses the deadline is presumed hung: everything behind it would time out too
+      const timer = setTimeout(() => {
+        this.stop(new Error(`Python worker timed out on ${venue}`));
+      }, REQUEST_TIMEOUT_MS);
+
+      this.pending.set(id, { resolve, reject, timer });
+      proc.stdin.write(JSON.stringify({ id, venue, source, deadline_ms: SCRAPE_DEADLINE_MS }) + '\n');
+    });
+  }
+}
+
+export class PythonScrapers {
+  private worker = new PythonWorker();
+
+  private async runPythonScraper(venue: string, source: 'browser' | 'simple', venueName: string): Promise<ScrapedEvent[]> {
+    try {
+      console.log(`Running Python scraper for ${venueName}...`);
+
+      const response = await this.worker.request(venue, source);
+      if (!response.ok) {
+        console.warn(`Python scraper error for ${venueName}:`, response.error);
         return [];
       }
-      
-      // Try to extract JSON from stdout
-      const lines = stdout.split('\n');
-      let jsonData = '';
-      let inJsonBlock = false;
-      
-      for (const line of lines) {
-        if (line.trim().startsWith('[') || line.trim().startsWith('{')) {
-          inJsonBlock = true;
-        }
-        if (inJsonBlock) {
-          jsonData += line + '\n';
-        }
-        if (line.trim().endsWith('}') || line.trim().endsWith(']')) {
-          break;
-        }
+
+      console.log(`Python scraper for ${venueName} finished in ${response.elapsed_ms}ms`);
+      if (response.partial) {
+        console.warn(`  ${venueName} ran out of time; keeping ${response.events?.length ?? 0} events parsed so far`);
       }
-      
-      if (jsonData.trim()) {
-        const events = JSON.parse(jsonData.trim());
-        return Array.isArray(events) ? events : [events];
+      if (response.metrics) {
+        console.log(`  ${venueName} phases: ${formatMetrics(response.metrics)}`);
       }
-      
-      return [];
+      return response.events || [];
     } catch (error) {
       console.error(`Python scraper error for ${venueName}:`, error);
       return [];
@@ -67,7 +164,7 @@ export class PythonScrapers {
     const venueName = 'Bottom of the Hill';
     try {
       // Use simple scraper as fallback
-      const events = await this.runPythonScript('simple_scrapers.py bottom', venueName);
+      const events = await this.runPythonScraper('bottom', 'simple', venueName);
       
       // Filter out calendar artifacts (days of week)
       const validEvents = events.filter(event => 
@@ -89,7 +186,7 @@ export class PythonScrapers {
   async scrapeTheChapel(): Promise<ScrapedEvent[]> {
     const venueName = 'The Chapel';
     try {
-      const events = await this.runPythonScript('scrape_chapel_1750111325552.py', venueName);
+      const events = await this.runPythonScraper('chapel', 'browser', venueName);
       
       const status = events.length > 0 ? 'success' : 'no_events';
       await scraperMonitor.recordScraperRun(venueName, status, events.length);
@@ -106,7 +203,7 @@ export class PythonScrapers {
   async scrapeGreatAmericanMusicHall(): Promise<ScrapedEvent[]> {
     const venueName = 'Great American Music Hall';
     try {
-      const events = await this.runPythonScript('scrape_gamh_1750111350561.py', venueName);
+      const events = await this.runPythonScraper('gamh', 'browser', venueName);
       
       const status = events.length > 0 ? 'success' : 'no_events';
       await scraperMonitor.recordScraperRun(venueName, status, events.length);
@@ -123,7 +220,7 @@ export class PythonScrapers {
   async scrapeTheIndependent(): Promise<ScrapedEvent[]> {
     const venueName = 'The Independent';
     try {
-      const events = await this.runPythonScript('scrape_independent_1750111371800.py', venueName);
+      const events = await this.runPythonScraper('independent', 'browser', venueName);
       
       const status = events.length > 0 ? 'success' : 'no_events';
       await scraperMonitor.recordScraperRun(venueName, status, events.length);
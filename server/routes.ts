@@ -147,8 +147,20 @@ export async function registerRoutes(app: Express): Promise<Server> {
     }
   });
 
+  // Accepts one event or an array of them; batch submitters may gzip the body (express.json inflates it)
   app.post("/api/events", async (req, res) => {
     try {
+      if (Array.isArray(req.body)) {
+        // Scraper batches arrive as JSON, so dates are ISO strings; a batch is inserted in one
+        // transaction and slugs already present are skipped, so a retried batch is a no-op
+        const eventsData = z.array(insertEventSchema.extend({ date: z.coerce.date() })).parse(req.body);
+        const created = eventsData.length
+          ? await db.transaction((tx) =>
+              tx.insert(events).values(eventsData).onConflictDoNothing({ target: events.slug }).returning()
+            )
+          : [];
+        return res.status(201).json({ inserted: created.length, skipped: eventsData.length - created.length });
+      }
       const eventData = insertEventSchema.parse(req.body);
       const event = await storage.createEvent(eventData);
       res.status(201).json(event);